@@ -1,26 +1,55 @@
-from jsonschema import validate as json_validate
+from jsonschema.validators import validator_for
+import fastjsonschema
 import requests
+from requests.adapters import HTTPAdapter
 import pandas
 import pydrodelta.util as util
 import json
+import orjson
 import os
 from datetime import datetime, timedelta
 import yaml
 import logging
-from pydrodelta.config import config
-from typing import List, Union
+from typing import List, Union, Dict, Optional
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from .descriptors.int_descriptor import IntDescriptor
 from .descriptors.string_descriptor import StringDescriptor
-from .descriptors.datetime_descriptor import DatetimeDescriptor
-from .descriptors.float_descriptor import FloatDescriptor
 from .descriptors.dict_descriptor import DictDescriptor
-logging.basicConfig(filename="%s/%s" % (os.environ["PYDRODELTA_DIR"],config["log"]["filename"]), level=logging.DEBUG, format="%(asctime)s:%(levelname)s:%(message)s")
-logging.FileHandler("%s/%s" % (os.environ["PYDRODELTA_DIR"],config["log"]["filename"]),"w+")
+
+logger = logging.getLogger(__name__)
 
 from .a5_schemas import schemas
 
-serie_schema = open("%s/data/schemas/yaml/serie.yml" % os.environ["PYDRODELTA_DIR"])
-serie_schema = yaml.load(serie_schema,yaml.CLoader)
+@lru_cache(maxsize=None)
+def _loadYamlCached(yml_path : str) -> dict:
+    """Load a static yaml file once per process. The parsed content is kept in memory (nothing is written to the package data directory)"""
+    with open(yml_path) as f:
+        return yaml.load(f,yaml.CLoader)
+
+serie_schema = _loadYamlCached("%s/data/schemas/yaml/serie.yml" % os.environ["PYDRODELTA_DIR"])
+
+def _compileValidator(schema : dict):
+    """Check schema once and return a reusable validator instance (same draft selection as jsonschema.validate)"""
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+_SCHEMAS_VALIDATOR = _compileValidator(schemas)
+_SERIE_VALIDATOR = _compileValidator(serie_schema)
+_SCHEMA_CLASSNAMES = frozenset(schemas["components"]["schemas"])
+
+def _compileClassValidator(classname : str):
+    """Compile a fastjsonschema validator for a component class. $refs are resolved against the full schemas document"""
+    return fastjsonschema.compile({**schemas, "$ref": "#/components/schemas/%s" % classname})
+
+_VALIDATE_OBS = _compileClassValidator("Observacion")
+_VALIDATE_CORRIDA = _compileClassValidator("Corrida")
+_VALIDATE_OBS_ARRAY = fastjsonschema.compile({**schemas, "type": "array", "items": {"$ref": "#/components/schemas/Observacion"}})
+_CLASS_VALIDATORS = {
+    "Observacion": _VALIDATE_OBS,
+    "Corrida": _VALIDATE_CORRIDA
+}
 
 def validate(
     instance : dict,
@@ -36,42 +65,39 @@ def validate(
         Exception: Invalid class if classname is not in schemas
 
         ValidationError: If instance does not validate against schema
+
+        JsonSchemaValueException: If classname has a compiled validator and instance does not validate against it
     """
-    if classname not in schemas["components"]["schemas"].keys():
+    if classname not in _SCHEMA_CLASSNAMES:
         raise Exception("Invalid class")
-    return json_validate(instance,schema=schemas) #[classname])
+    class_validator = _CLASS_VALIDATORS.get(classname)
+    if class_validator is not None:
+        class_validator(instance)
+        return
+    return _SCHEMAS_VALIDATOR.validate(instance) #[classname])
 
 # CLASSES
 
 class Observacion():
     """Represents a time-value pair of an observed variable"""
 
-    timestart = DatetimeDescriptor() # util.tryParseAndLocalizeDate(params["timestart"])
-    """begin timestamp of the observation"""
-
-    valor = FloatDescriptor()
-    """value of the observation"""
-    
-    timeend = DatetimeDescriptor() # (None, False) if "timeend" not in params else util.tryParseAndLocalizeDate(params["timeend"])
-    """end timestamp of the observation"""
-
-    series_id = IntDescriptor()
-    """Series identifier"""
-
-    tipo = StringDescriptor()
-    """Series geometry type (puntual, areal, raster)"""
-
-    tag = StringDescriptor()
-    """Observation tag"""
+    __slots__ = {
+        "timestart": "begin timestamp of the observation",
+        "valor": "value of the observation",
+        "timeend": "end timestamp of the observation",
+        "series_id": "Series identifier",
+        "tipo": "Series geometry type (puntual, areal, raster)",
+        "tag": "Observation tag"
+    }
 
     def __init__(
         self,
         timestart : datetime,
         valor : float,
-        timeend : datetime = None,
-        series_id : int = None,
+        timeend : Optional[datetime] = None,
+        series_id : Optional[int] = None,
         tipo : str = "puntual",
-        tag : str = None
+        tag : Optional[str] = None
     ):
         """
         Args:
@@ -81,14 +107,26 @@ class Observacion():
             series_id (int, optional): Series identifier. Defaults to None.
             tipo (str, optional): Series geometry type (puntual, areal, raster) . Defaults to "puntual".
             tag (str, optional): Observation tag. Defaults to None.
+        
+        Raises:
+            ValueError: if any of the arguments can't be parsed into its type
         """
         # json_validate(params,"Observacion")
-        self.timestart = timestart
-        self.timeend = timeend
-        self.valor = valor
-        self.series_id = series_id
-        self.tipo = tipo
-        self.tag = tag
+        try:
+            self.timestart = util.tryParseAndLocalizeDate(timestart) if timestart is not None else None
+            self.timeend = util.tryParseAndLocalizeDate(timeend) if timeend is not None else None
+        except ValueError:
+            raise ValueError('"timestart" and "timeend" must be dates') from None
+        try:
+            self.valor = float(valor) if valor is not None else None
+        except ValueError:
+            raise ValueError('"valor" must be a float') from None
+        try:
+            self.series_id = int(series_id) if series_id is not None else None
+        except ValueError:
+            raise ValueError('"series_id" must be a int') from None
+        self.tipo = str(tipo) if tipo is not None else None
+        self.tag = str(tag) if tag is not None else None
 
     def toDict(self) -> dict:
         """Convert to dict"""
@@ -123,8 +161,8 @@ class Serie():
 
     def __init__(
         self,
-        id : int = None,
-        tipo : str = None,
+        id : Optional[int] = None,
+        tipo : Optional[str] = None,
         observaciones : List[dict] = []
         ):
         """
@@ -133,7 +171,7 @@ class Serie():
             tipo (str, optional): Geometry type: puntual, areal, raster. Defaults to None.
             observaciones (List[dict], optional): Observations. Each dict must have timestart (datetime) and valor (float). Defaults to [].
         """
-        json_validate({"id": id, "tipo": tipo, "observaciones": observaciones}, schema=serie_schema)
+        _SERIE_VALIDATOR.validate({"id": id, "tipo": tipo, "observaciones": observaciones})
         self.id = id
         self.tipo = tipo
         self.observaciones = observaciones
@@ -150,11 +188,33 @@ class Serie():
 class Crud():
     """a5 api client"""
 
-    url = StringDescriptor()
-    """api url"""
+    @property
+    def url(self) -> str:
+        """api url"""
+        return self._url
+    @url.setter
+    def url(
+        self,
+        url : str
+    ) -> None:
+        self._url = str(url) if url is not None else None
+        self._obs_base = f"{self._url}/obs"
+        self._sim_base = f"{self._url}/sim/calibrados"
 
-    token = StringDescriptor()
-    """ api authorization token"""
+    @property
+    def token(self) -> str:
+        """ api authorization token"""
+        return self._token
+    @token.setter
+    def token(
+        self,
+        token : str
+    ) -> None:
+        self._token = str(token) if token is not None else None
+        if self._token is not None:
+            self._session.headers.update({'Authorization': 'Bearer ' + self._token})
+        else:
+            self._session.headers.pop('Authorization', None)
 
     proxy_dict = DictDescriptor()
     """proxy parameters"""
@@ -171,6 +231,10 @@ class Crud():
             token (str): api authorization token
             proxy_dict (dict, optional): proxy parameters. Defaults to None.
         """
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         self.url = url
         self.token = token
         self.proxy_dict = proxy_dict
@@ -234,17 +298,34 @@ class Crud():
             date_range_before = date_range_before if isinstance(date_range_before,str) else date_range_before.isoformat()
         if date_range_after is not None:
             date_range_after =date_range_after if isinstance(date_range_after,str) else date_range_after.isoformat()
-        params = locals()
-        del params["use_proxy"]
-        del params["tipo"]
-        response = requests.get("%s/obs/%s/series" % (self.url, tipo),
+        params = {k: v for k, v in (
+            ("series_id", series_id),
+            ("area_id", area_id),
+            ("estacion_id", estacion_id),
+            ("escena_id", escena_id),
+            ("var_id", var_id),
+            ("proc_id", proc_id),
+            ("unit_id", unit_id),
+            ("fuentes_id", fuentes_id),
+            ("tabla", tabla),
+            ("id_externo", id_externo),
+            ("geom", geom),
+            ("include_geom", include_geom),
+            ("no_metadata", no_metadata),
+            ("date_range_before", date_range_before),
+            ("date_range_after", date_range_after),
+            ("getMonthlyStats", getMonthlyStats),
+            ("getStats", getStats),
+            ("getPercentiles", getPercentiles),
+            ("percentil", percentil)
+        ) if v is not None}
+        response = self._session.get(f"{self._obs_base}/{tipo}/series",
             params = params,
-            headers = {'Authorization': 'Bearer ' + self.token},
             proxies = self.proxy_dict if use_proxy else None
         )
         if response.status_code != 200:
             raise Exception("request failed: %s" % response.text)
-        json_response = response.json()
+        json_response = orjson.loads(response.content)
         return json_response
 
     def readSerie(
@@ -276,16 +357,44 @@ class Crud():
                 "timestart": timestart if isinstance(timestart,str) else timestart.isoformat(),
                 "timeend": timeend if isinstance(timeend,str) else timeend.isoformat()
             }
-        response = requests.get("%s/obs/%s/series/%i" % (self.url, tipo, series_id),
+        response = self._session.get(f"{self._obs_base}/{tipo}/series/{int(series_id)}",
             params = params,
-            headers = {'Authorization': 'Bearer ' + self.token},
             proxies = self.proxy_dict if use_proxy else None
         )
         if response.status_code != 200:
             raise Exception("request failed for series tipo: %s, id: %s. message: %s" % (tipo, series_id, response.text))
-        json_response = response.json()
+        json_response = orjson.loads(response.content)
         return json_response
 
+    def readSeriesBatch(
+        self,
+        series_ids : List[int],
+        timestart : datetime = None,
+        timeend : datetime = None,
+        tipo : str = "puntual",
+        use_proxy : bool = False,
+        max_workers : int = 8
+        ) -> Dict[int,dict]:
+        """Retrieve several series concurrently. Requests share the client session and are dispatched through a thread pool
+
+        Args:
+            series_ids (List[int]): Series identifiers
+            timestart (datetime, optional): Begin timestamp. Defaults to None.
+            timeend (datetime, optional): End timestamp. Defaults to None.
+            tipo (str, optional): Geometry type: puntual, areal, raster. Defaults to "puntual".
+            use_proxy (bool, optional): Perform request through proxy. Defaults to False.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to 8.
+
+        Raises:
+            Exception: Request failed if any response status code is not 200
+
+        Returns:
+            Dict[int,dict]: raw serie dicts keyed by series_id
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {series_id: executor.submit(self.readSerie, series_id, timestart, timeend, tipo, use_proxy) for series_id in series_ids}
+            return {series_id: future.result() for series_id, future in futures.items()}
+
     def createObservaciones(
         self,
         data : Union[pandas.DataFrame, list],
@@ -306,6 +415,7 @@ class Crud():
             use_proxy (bool, optional): Perform request through proxy. Defaults to False.
 
         Raises:
+            JsonSchemaValueException: If an item does not validate against Observacion schema (timestart string and non-null valor are required)
             Exception: Request failed if response status code is not 200
 
         Returns:
@@ -313,16 +423,40 @@ class Crud():
         """
         if isinstance(data,pandas.DataFrame):
             data = observacionesDataFrameToList(data,series_id,column,timeSupport)
-        [validate(x,"Observacion") for x in data]
-        url = "%s/obs/%s/series/%i/observaciones" % (self.url, tipo, series_id) if series_id is not None else "%s/obs/%s/observaciones" % (self.url, tipo)
-        response = requests.post(url, json = {
-                "observaciones": data
-            }, headers = {'Authorization': 'Bearer ' + self.token},
+        return self.createObservacionesFromList(data, series_id, tipo, use_proxy)
+
+    def createObservacionesFromList(
+        self,
+        data : list,
+        series_id : int,
+        tipo : str = "puntual",
+        use_proxy : bool = False
+        ) -> list:
+        """Create observations from a list of observation dicts
+
+        Args:
+            data (list): list of observation dicts (timestart, valor and optionally timeend, series_id)
+            series_id (int): series identifier
+            tipo (str, optional): geometry type (puntual, areal, raster). Defaults to "puntual".
+            use_proxy (bool, optional): Perform request through proxy. Defaults to False.
+
+        Raises:
+            JsonSchemaValueException: If an item does not validate against Observacion schema (timestart string and non-null valor are required)
+            Exception: Request failed if response status code is not 200
+
+        Returns:
+            list: list of created observations
+        """
+        _VALIDATE_OBS_ARRAY(data)
+        url = f"{self._obs_base}/{tipo}/series/{int(series_id)}/observaciones" if series_id is not None else f"{self._obs_base}/{tipo}/observaciones"
+        response = self._session.post(url,
+            data = orjson.dumps({"observaciones": data}, option=orjson.OPT_SERIALIZE_NUMPY),
+            headers = {'Content-Type': 'application/json'},
             proxies = self.proxy_dict if use_proxy else None
         )
         if response.status_code != 200:
             raise Exception("request failed: %s" % response.text)
-        json_response = response.json()
+        json_response = orjson.loads(response.content)
         return json_response
 
     def readCalibrado(
@@ -342,13 +476,13 @@ class Crud():
         Returns:
             dict: _description_
         """
-        url = "%s/sim/calibrados/%i" % (self.url, cal_id)
-        response = requests.get(url,headers = {'Authorization': 'Bearer ' + self.token},
+        url = f"{self._sim_base}/{int(cal_id)}"
+        response = self._session.get(url,
             proxies = self.proxy_dict if use_proxy else None
         )
         if response.status_code != 200:
             raise Exception("request failed: status: %i, message: %s" % (response.status_code, response.text))
-        json_response = response.json()
+        json_response = orjson.loads(response.content)
         return json_response
 
     def createCorrida(
@@ -365,6 +499,7 @@ class Crud():
             use_proxy (bool, optional): Perform request through proxy. Defaults to False.
 
         Raises:
+            JsonSchemaValueException: If data does not validate against Corrida schema (forecast_date and series are required)
             Exception: if cal_id is missing from args and from data
             Exception: Request failed if response status code is not 200
 
@@ -375,14 +510,16 @@ class Crud():
         cal_id = cal_id if cal_id is not None else data["cal_id"] if "cal_id" in data else None
         if cal_id is None:
             raise Exception("Missing parameter cal_id")
-        url = "%s/sim/calibrados/%i/corridas" % (self.url, cal_id)
-        response = requests.post(url, json = data, headers = {'Authorization': 'Bearer ' + self.token},
+        url = f"{self._sim_base}/{int(cal_id)}/corridas"
+        response = self._session.post(url,
+            data = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+            headers = {'Content-Type': 'application/json'},
             proxies = self.proxy_dict if use_proxy else None
         )
-        logging.debug("createCorrida url: %s" % response.url)
+        logger.debug("createCorrida url: %s" % response.url)
         if response.status_code != 200:
             raise Exception("request failed: status: %i, message: %s" % (response.status_code, response.text))
-        json_response = response.json()
+        json_response = orjson.loads(response.content)
         return json_response
 
     def readVar(
@@ -402,13 +539,12 @@ class Crud():
         Returns:
             dict: the retrieved variable
         """
-        response = requests.get("%s/obs/variables/%i" % (self.url, var_id),
-            headers = {'Authorization': 'Bearer ' + self.token},
+        response = self._session.get(f"{self._obs_base}/variables/{int(var_id)}",
             proxies = self.proxy_dict if use_proxy else None
         )
         if response.status_code != 200:
             raise Exception("request failed: %s" % response.text)
-        json_response = response.json()
+        json_response = orjson.loads(response.content)
         return json_response
 
     def readSerieProno(
@@ -443,18 +579,16 @@ class Crud():
         Returns:
             dict : a forecast run 
         """
-        params = {}
         if forecast_date is not None:
-            corridas_response = requests.get("%s/sim/calibrados/%i/corridas" % (self.url, cal_id),
+            corridas_response = self._session.get(f"{self._sim_base}/{int(cal_id)}/corridas",
                 params = {
                     "forecast_date": forecast_date if isinstance(forecast_date,str) else forecast_date.isoformat()
                 },
-                headers = {'Authorization': 'Bearer ' + self.token},
                 proxies = self.proxy_dict if use_proxy else None
             )
             if corridas_response.status_code != 200:
                 raise Exception("request failed: %s" % corridas_response.text)
-            corridas = corridas_response.json()
+            corridas = orjson.loads(corridas_response.content)
             if len(corridas):
                 cor_id = corridas[0]["cor_id"]
             else:
@@ -463,78 +597,76 @@ class Crud():
                 "series_id": series_id,
                 "pronosticos": []
             }
+        params = {
+            "series_id": series_id
+        }
         if timestart is not None and timeend is not None:
-            params = {
-                "timestart": timestart if isinstance(timestart,str) else timestart.isoformat(),
-                "timeend": timeend if isinstance(timestart,str) else timeend.isoformat(),
-                "series_id": series_id
-            }
+            params["timestart"] = timestart if isinstance(timestart,str) else timestart.isoformat()
+            params["timeend"] = timeend if isinstance(timestart,str) else timeend.isoformat()
         if qualifier is not None:
             params["qualifier"] = qualifier
         params["includeProno"] = True
-        url = "%s/sim/calibrados/%i/corridas/last" % (self.url, cal_id)
+        url = f"{self._sim_base}/{int(cal_id)}/corridas/last"
         if cor_id is not None:
-            url = "%s/sim/calibrados/%i/corridas/%i" % (self.url, cal_id, cor_id)
-        response = requests.get(url,
+            url = f"{self._sim_base}/{int(cal_id)}/corridas/{int(cor_id)}"
+        response = self._session.get(url,
             params = params,
-            headers = {'Authorization': 'Bearer ' + self.token},
             proxies = self.proxy_dict if use_proxy else None
         )
         if response.status_code != 200:
             raise Exception("request failed: %s" % response.text)
-        json_response = response.json()
-        if "series" not in json_response:
-            print("Warning: series %i from cal_id %i not found" % (series_id,cal_id))
-            return {
-                "forecast_date": json_response["forecast_date"],
-                "cal_id": json_response["cal_id"],
-                "cor_id": json_response["cor_id"],
-                "series_id": series_id,
-                "qualifier": None,
-                "pronosticos": []
-            }
-        if not len(json_response["series"]):
+        json_response = orjson.loads(response.content)
+        if "series" not in json_response or not len(json_response["series"]):
             print("Warning: series %i from cal_id %i not found" % (series_id,cal_id))
-            return {
-                "forecast_date": json_response["forecast_date"],
-                "cal_id": json_response["cal_id"],
-                "cor_id": json_response["cor_id"],
-                "series_id": series_id,
-                "qualifier": None,
-                "pronosticos": []
-            }
-        if "pronosticos" not in json_response["series"][0]:
+            return _emptyPronoResult(json_response, series_id)
+        serie = json_response["series"][0]
+        if "pronosticos" not in serie:
             print("Warning: pronosticos from series %i from cal_id %i not found" % (series_id,cal_id))
-            return {
-                "forecast_date": json_response["forecast_date"],
-                "cal_id": json_response["cal_id"],
-                "cor_id": json_response["cor_id"],
-                "series_id": json_response["series"][0]["series_id"],
-                "qualifier": json_response["series"][0]["qualifier"],
-                "pronosticos": []
-            }
-        if not len(json_response["series"][0]["pronosticos"]):
+            return _emptyPronoResult(json_response, series_id, serie)
+        pronosticos = serie["pronosticos"]
+        if not len(pronosticos):
             print("Warning: pronosticos from series %i from cal_id %i is empty" % (series_id,cal_id))
-            return {
-                "forecast_date": json_response["forecast_date"],
-                "cal_id": json_response["cal_id"],
-                "cor_id": json_response["cor_id"],
-                "series_id": json_response["series"][0]["series_id"],
-                "qualifier": json_response["series"][0]["qualifier"],
-                "pronosticos": []
-            }
-        json_response["series"][0]["pronosticos"] = [ { "timestart": x[0], "valor": x[2]} if type(x) == list else { "timestart": x["timestart"], "valor": x["valor"]} for x in json_response["series"][0]["pronosticos"]] # "series_id": series_id, "timeend": x[1] "qualifier":x[3]
+            return _emptyPronoResult(json_response, series_id, serie)
+        if isinstance(pronosticos[0], list):
+            pronosticos = [ { "timestart": x[0], "valor": x[2]} for x in pronosticos] # "series_id": series_id, "timeend": x[1] "qualifier":x[3]
+        else:
+            pronosticos = [ { "timestart": x["timestart"], "valor": x["valor"]} for x in pronosticos]
+        serie["pronosticos"] = pronosticos
         return {
             "forecast_date": json_response["forecast_date"],
             "cal_id": json_response["cal_id"],
             "cor_id": json_response["id"] if "id" in json_response else json_response["cor_id"],
-            "series_id": json_response["series"][0]["series_id"],
-            "qualifier": json_response["series"][0]["qualifier"] if "qualifier" in json_response["series"][0] else None,
-            "pronosticos": json_response["series"][0]["pronosticos"]
+            "series_id": serie["series_id"],
+            "qualifier": serie["qualifier"] if "qualifier" in serie else None,
+            "pronosticos": pronosticos
         }
 
 ## AUX functions
 
+def _emptyPronoResult(
+    json_response : dict,
+    series_id : int,
+    serie : dict = None
+    ) -> dict:
+    """Build the readSerieProno result for a forecast run that has no pronosticos for the requested series
+
+    Args:
+        json_response (dict): forecast run as returned by the api
+        series_id (int): requested series identifier. Used when serie is None
+        serie (dict, optional): matching series of the forecast run. Defaults to None.
+
+    Returns:
+        dict: forecast run with empty pronosticos
+    """
+    return {
+        "forecast_date": json_response["forecast_date"],
+        "cal_id": json_response["cal_id"],
+        "cor_id": json_response["cor_id"],
+        "series_id": serie["series_id"] if serie is not None else series_id,
+        "qualifier": serie["qualifier"] if serie is not None else None,
+        "pronosticos": []
+    }
+
 def observacionesDataFrameToList(
     data : pandas.DataFrame,
     series_id : int,
@@ -563,12 +695,10 @@ def observacionesDataFrameToList(
     if column not in data.columns:
         raise Exception("column %s not found in data" % column)
     data = data.sort_index()
-    data["series_id"] = series_id
-    data["timeend"] = data.index.map(lambda x: x.isoformat()) if timeSupport is None else data.index.map(lambda x: (x + timeSupport).isoformat())
-    data["timestart"] = data.index.map(lambda x: x.isoformat()) # strftime('%Y-%m-%dT%H:%M:%SZ') 
-    data["valor"] = data[column]
-    data = data[["series_id","timestart","timeend","valor"]]
-    return data.to_dict(orient="records")
+    timestart = util.isoformatDatetimeIndex(data.index)
+    timeend = timestart if timeSupport is None else util.isoformatDatetimeIndex(data.index + timeSupport)
+    valores = data[column].to_numpy(dtype=float).tolist()
+    return [{"series_id": series_id, "timestart": t, "timeend": e, "valor": v} for t, e, v in zip(timestart.tolist(), timeend.tolist(), valores)]
 
 def observacionesListToDataFrame(
     data: list, 
@@ -590,7 +720,7 @@ def observacionesListToDataFrame(
         raise Exception("empty list")
     data = pandas.DataFrame.from_dict(data)
     data["valor"] = data["valor"].astype(float)
-    data.index = data["timestart"].apply(util.tryParseAndLocalizeDate)
+    data.index = util.tryParseAndLocalizeDates(data["timestart"])
     data.sort_index(inplace=True)
     if tag is not None:
         data["tag"] = tag
@@ -598,10 +728,25 @@ def observacionesListToDataFrame(
     else:
         return data[["valor",]]
 
+@lru_cache(maxsize=8)
+def _emptyObsDataFrameTemplate(
+    extra_columns : tuple = ()
+    ) -> pandas.DataFrame:
+    data = pandas.DataFrame({
+        "timestart": pandas.Series(dtype='datetime64[ns, America/Argentina/Buenos_Aires]'),
+        "valor": pandas.Series(dtype="float")
+    })
+    cnames = ["valor"]
+    for cname, dtype in extra_columns:
+        data[cname] = pandas.Series(dtype=dtype)
+        cnames.append(cname)
+    data.index = data["timestart"]
+    return data[cnames]
+
 def createEmptyObsDataFrame(
     extra_columns : dict = None
     ) -> pandas.DataFrame:
-    """Create Observations DataFrame with no rows
+    """Create Observations DataFrame with no rows. The frame is copied from a cached template instead of being built on every call
 
     Args:
         extra_columns (dict, optional): Additional columns. Keys are the column names, values are the column types. Defaults to None.
@@ -609,17 +754,7 @@ def createEmptyObsDataFrame(
     Returns:
         pandas.DataFrame: Observations dataframe
     """
-    data = pandas.DataFrame({
-        "timestart": pandas.Series(dtype='datetime64[ns, America/Argentina/Buenos_Aires]'),
-        "valor": pandas.Series(dtype="float")
-    })
-    cnames = ["valor"]
-    if extra_columns is not None:
-        for cname in extra_columns:
-            data[cname] = pandas.Series(dtype=extra_columns[cname])
-            cnames.append(cname)
-    data.index = data["timestart"]
-    return data[cnames]
+    return _emptyObsDataFrameTemplate(tuple(extra_columns.items()) if extra_columns is not None else ()).copy()
 
 ## EJEMPLO
 '''
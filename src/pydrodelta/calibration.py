@@ -1,31 +1,97 @@
-from numpy import array, isnan
-from .downhill_simplex import DownhillSimplex
+from numpy import array, ndarray, ascontiguousarray, fromiter, float64, inf, random, dtype as np_dtype
+from numpy.random import Generator, default_rng
+from math import isnan
+from collections import OrderedDict
+from functools import partial
+from .downhill_simplex import DownhillSimplex, SimplexVertex, adaptive_coefficients, make_step_schedule
 import logging
 import os
+from pathlib import Path
 import json
 from .util import tryParseAndLocalizeDate
-from typing import Optional, List, Union, Tuple
+from typing import Optional, List, Union, Tuple, Callable
 from datetime import datetime
 from .descriptors.bool_descriptor import BoolDescriptor
 from .descriptors.int_descriptor import IntDescriptor
 from .descriptors.string_descriptor import StringDescriptor
 from .descriptors.float_descriptor import FloatDescriptor
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_worker_calibration = None
+"""Calibration instance of the current worker process (see Calibration.workers)"""
+
+def _initWorker(calibration) -> None:
+    """ProcessPoolExecutor initializer: keeps a copy of the calibration (with its procedure input and observed output already loaded) in the worker process"""
+    global _worker_calibration
+    _worker_calibration = calibration
+
+def _evalPoint(args : Tuple[list, Optional[str], Optional[int], Optional[bool]]) -> float:
+    """Run the worker calibration's procedure with the given parameters and return the objective function value"""
+    parameters, objective_function, result_index, limit = args
+    return _worker_calibration.runReturnScore(parameters, objective_function, result_index, limit)
+
+def _runStart(args : Tuple[int, dict]) -> Tuple[List[float],float]:
+    """Run one start of a multi-start calibration in the worker process"""
+    seed, kwargs = args
+    return _worker_calibration.runStart(seed, **kwargs)
+
+_JSON_SAFE_TYPES = (type(None), bool, int, float, str, list, tuple, dict)
+
+OBJECTIVE_SENSE = 1
+"""Sense of the optimization: DownhillSimplex minimizes the objective function value as returned by the procedure statistics (1 = lower is better)"""
+
+PENALTY_SCORE = OBJECTIVE_SENSE * 1e12
+"""Objective function value given, without running the procedure, to parameter sets outside the min-max constraints: the worst value for the optimization sense. Finite, so that the simplex arithmetic stays finite"""
 
 class Calibration:
     """Calibration procedure using Nelder Mead Downhill Simplex"""
     
     _valid_objective_function = ['rmse','mse','bias','stdev_dif','r','nse','cov',"oneminusr"]
 
+    _valid_dtype = ['float64','float32']
+
+    _score_cache_size = 256
+    """Maximum number of entries of the runReturnScore memoization cache"""
+
+    _penalty_score = PENALTY_SCORE
+    """Objective function value returned by runReturnScore, without running the procedure, for parameter sets outside the procedure function's min-max constraints (when limit=True)"""
+
     calibrate = BoolDescriptor()
     """Perform the calibration"""
 
     result_index = IntDescriptor()
     """Index of the result element to use to compute the objective function"""
 
-    objective_function = StringDescriptor()
-    """
-    Objective function for the calibration procedure. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr' 
-    """
+    @property
+    def objective_function(self) -> str:
+        """
+        Objective function for the calibration procedure. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr' 
+        """
+        return self._objective_function
+    @objective_function.setter
+    def objective_function(
+        self,
+        objective_function : str
+        ) -> None:
+        self._objective_function = str(objective_function) if objective_function is not None else None
+
+    @property
+    def dtype(self) -> str:
+        """
+        Floating point type of the parameter arrays passed to the procedure. One of 'float64', 'float32'
+        """
+        return self._dtype.name
+    @dtype.setter
+    def dtype(
+        self,
+        dtype : str
+        ) -> None:
+        dtype = np_dtype(dtype if dtype is not None else float64)
+        if dtype.name not in self._valid_dtype:
+            raise ValueError("dtype must be one of %s" % ",".join(self._valid_dtype))
+        self._dtype = dtype
 
     limit = BoolDescriptor()
     """Limit values of the parameters to the provided min-max ranges"""
@@ -45,8 +111,9 @@ class Calibration:
         if ranges is not None:
             if not isinstance(ranges,(list,tuple)):
                 raise ValueError("Invalid ranges argument. Must be a list")
-            if len(ranges) != len(self._procedure.function._parameters):
-                raise ValueError("Invalid ranges argument length. Must be equal the number of parameters of the procedure function (_procedure.function._parameters) =  %i. Instead, length is %i" % (len(self._procedure.function._parameters), len(ranges)))
+            n_parameters = len(self._procedure.function._parameters)
+            if len(ranges) != n_parameters:
+                raise ValueError("Invalid ranges argument length. Must be equal the number of parameters of the procedure function (_procedure.function._parameters) =  %i. Instead, length is %i" % (n_parameters, len(ranges)))
             self._ranges = list()
             for i, r in enumerate(ranges):
                 if not isinstance(r,(list,tuple)):
@@ -66,6 +133,29 @@ class Calibration:
     max_iter = IntDescriptor()
     """maximum iterations"""
 
+    adaptive = BoolDescriptor()
+    """Use dimension-dependent Nelder-Mead coefficients (Gao & Han, 2012)"""
+
+    workers = IntDescriptor()
+    """Number of worker processes used to evaluate simplex points concurrently. If 1, points are evaluated sequentially"""
+
+    multistart = IntDescriptor()
+    """Number of independent downhill simplex runs, each from a different random initial simplex. The best result is kept"""
+
+    kappa_0 = FloatDescriptor()
+    """Maximum step factor of the downhill simplex step schedule (see downhill_simplex.StepSchedule). If None, the reflection and expansion steps are constant"""
+
+    grow = FloatDescriptor()
+    """Step schedule: after an improving iteration the step factor is raised to this power (capped at kappa_0)"""
+
+    shrink = FloatDescriptor()
+    """Step schedule: after several iterations without improvement the step factor is raised to this power"""
+
+    @property
+    def multistart_results(self) -> List[Tuple[List[float],float]]:
+        """Result of each start of the last multi-start calibration (parameters, objective function value)"""
+        return self._multistart_results
+
     @property
     def calibration_result(self) -> Tuple[List[float],float]:
         """Calibration result. First element is the list of obtained parameters. The second element is the obtained objective function value"""
@@ -86,8 +176,21 @@ class Calibration:
         self._calibration_period = self.parseCalibrationPeriod(calibration_period) if calibration_period is not None else None
 
     @property
-    def simplex(self) -> List[Tuple[List[float],float]]:
-        return self._simplex
+    def simplex(self) -> List[SimplexVertex]:
+        """Initial simplex. Each item is a SimplexVertex (parameter list, objective function value). Built on demand from .simplex_points and .simplex_scores"""
+        if self._simplex_points is None:
+            return None
+        return [SimplexVertex(p, score) for p, score in zip(self._simplex_points.tolist(), self._simplex_scores.tolist())]
+
+    @property
+    def simplex_points(self) -> ndarray:
+        """Parameter sets of the initial simplex. Array of shape (number of parameters + 1, number of parameters)"""
+        return self._simplex_points
+
+    @property
+    def simplex_scores(self) -> ndarray:
+        """Objective function values of the initial simplex. Array of shape (number of parameters + 1,)"""
+        return self._simplex_scores
 
     @property
     def downhill_simplex(self) -> DownhillSimplex:
@@ -107,7 +210,14 @@ class Calibration:
             max_stagnations : int = 10,
             max_iter : int = 5000,
             save_result : str = None,
-            calibration_period : list = None
+            calibration_period : list = None,
+            workers : int = 1,
+            adaptive : bool = False,
+            multistart : int = 1,
+            dtype : str = "float64",
+            kappa_0 : float = None,
+            grow : float = 2.,
+            shrink : float = 0.5
             ):
         """
         Parameters:
@@ -158,6 +268,34 @@ class Calibration:
         calibration_period : list = None
 
             Calibration period (begin date, end date) 
+
+        workers : int = 1
+
+            Number of worker processes used to evaluate simplex points concurrently. If 1, points are evaluated sequentially
+
+        adaptive : bool = False
+
+            Use dimension-dependent Nelder-Mead coefficients (Gao & Han, 2012, Implementing the Nelder-Mead simplex algorithm with adaptive parameters): reflection 1, expansion 1+2/n, contraction 0.75-1/(2n), reduction 1-1/n, where n is the number of parameters. Improves convergence when calibrating many parameters
+
+        multistart : int = 1
+
+            Number of independent downhill simplex runs, each from a different random initial simplex. The best result is kept. If workers > 1, the starts run concurrently
+
+        dtype : str = "float64"
+
+            Floating point type of the parameter arrays passed to the procedure. One of 'float64', 'float32'. Objective function statistics are always computed in float64
+
+        kappa_0 : float = None
+
+            Enable the downhill simplex step schedule (see downhill_simplex.StepSchedule) with this maximum step factor (>= 1). The factor multiplies the reflection and expansion steps: it is raised to grow (up to kappa_0) after an improving iteration and to shrink after 3 iterations without improvement, decaying towards the standard step (1). If None, the steps are constant
+
+        grow : float = 2
+
+            Step schedule grow exponent
+
+        shrink : float = 0.5
+
+            Step schedule shrink exponent
         """
         self._procedure = procedure
         self.calibrate = calibrate
@@ -172,10 +310,24 @@ class Calibration:
         self.max_stagnations = max_stagnations
         self.max_iter = max_iter
         self._downhill_simplex = None
-        self._simplex = None
+        self._simplex_points = None
+        self._simplex_scores = None
+        self._simplex_sig = None
         self._calibration_result = None
+        self._score_cache = OrderedDict()
+        self._pydrodelta_dir = Path(os.environ["PYDRODELTA_DIR"])
+        self._parameter_bounds = None
+        self._batch_run = getattr(procedure, "batch_run", False)
         self.save_result = save_result
         self.calibration_period = calibration_period
+        self.workers = workers
+        self.adaptive = adaptive
+        self.multistart = multistart
+        self._multistart_results = None
+        self.dtype = dtype
+        self.kappa_0 = kappa_0
+        self.grow = grow
+        self.shrink = shrink
 
     def toDict(self):
         cal_dict = {
@@ -189,16 +341,21 @@ class Calibration:
             "max_stagnations": self.max_stagnations,
             "max_iter": self.max_iter,
             "save_result": self.save_result,
-            "calibration_period": [self.calibration_period[0].isoformat(), self.calibration_period[0].isoformat()] if self.calibration_period is not None else None,
+            "calibration_period": [self.calibration_period[0].isoformat(), self.calibration_period[1].isoformat()] if self.calibration_period is not None else None,
+            "workers": self.workers,
+            "adaptive": self.adaptive,
+            "multistart": self.multistart,
+            "dtype": self.dtype,
+            "kappa_0": self.kappa_0,
+            "grow": self.grow,
+            "shrink": self.shrink,
             "calibration_result": self.calibration_result,
             "simplex": self.simplex
         }
-        for key in cal_dict:
-            try:
-                json.dumps(cal_dict[key])
-            except TypeError as e:
-                logging.error("calibration['%s'] is not JSON serializable" % key)
-                raise(e)
+        for key, value in cal_dict.items():
+            if not isinstance(value, _JSON_SAFE_TYPES):
+                logger.error("calibration['%s'] is not JSON serializable", key)
+                raise TypeError("calibration['%s'] of type %s is not JSON serializable" % (key, type(value).__name__))
         return cal_dict
     
     def parseCalibrationPeriod(
@@ -212,15 +369,33 @@ class Calibration:
             tryParseAndLocalizeDate(cal_period[1])
         )
     
+    def getParameterBounds(self) -> Tuple[ndarray, ndarray]:
+        """Lower and upper bounds of the procedure function parameters (ModelParameter.min, ModelParameter.max). A missing bound is unbounded
+        
+        Returns:
+        --------
+        (lower bounds, upper bounds) : Tuple[ndarray, ndarray]
+        """
+        if self._parameter_bounds is None:
+            parameters = self._procedure.function._parameters
+            self._parameter_bounds = (
+                array([p.min if p.min is not None else -inf for p in parameters], dtype=float64),
+                array([p.max if p.max is not None else inf for p in parameters], dtype=float64)
+            )
+        return self._parameter_bounds
+
     def runReturnScore(
         self,
         parameters : array, 
         objective_function : Optional[str] = None, 
-        result_index : Optional[int] = None
+        result_index : Optional[int] = None,
+        limit : Optional[bool] = None
         ) -> float:
         """
         Runs procedure and returns objective function value
         procedure.input and procedure.output_obs must be already loaded
+        Results are memoized on (parameters, objective_function, result_index, limit), so repeated parameter sets don't run the procedure again
+        If limit=True, parameter sets outside the min-max constraints of the procedure function parameters (ModelParameter.min, ModelParameter.max) are not run and get a penalty score (PENALTY_SCORE). The ranges only set where the initial simplex is drawn, so they are not used as bounds
 
         Parameters:
         -----------
@@ -236,22 +411,203 @@ class Calibration:
 
             Index of the output to use to compute the objective function
 
+        limit : Optional[bool] = None
+
+            Give the penalty score to parameter sets outside the min-max constraints. Defaults to self.limit
+
         Returns:
         --------
         the objective function value : float
         """
-        objective_function = objective_function if objective_function is not None else self.objective_function
+        objective_function = objective_function if objective_function is not None else self._objective_function
         result_index = result_index if result_index is not None else self.result_index
-        self._procedure.run(
+        limit = limit if limit is not None else self.limit
+        parameters_array = array(parameters, dtype=self._dtype)
+        if limit and self.outOfBounds(parameters_array):
+            return self._penalty_score
+        score_cache = self._score_cache
+        key = (parameters_array.tobytes(), objective_function, result_index, limit)
+        if key in score_cache:
+            score_cache.move_to_end(key)
+            return score_cache[key]
+        procedure = self._procedure
+        # float64 parameters are passed through unchanged
+        run_dtype = self._dtype if self._dtype != float64 else None
+        # skip the full statistics set, compute only the objective function
+        procedure.run(
             parameters=parameters, 
             save_results="", 
             load_input=False, 
-            load_output_obs=False
+            load_output_obs=False,
+            compute_statistics=False,
+            dtype=run_dtype
         )
-        value = getattr(self._procedure.procedure_function_results.statistics[result_index],objective_function)
-        logging.debug((parameters, value))
+        value = procedure.computeScore(objective_function, result_index)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("parameters=%r value=%r", parameters, value)
+        self._cacheScore(key, value)
         return value
 
+    def _cacheScore(
+        self,
+        key : tuple,
+        value : float
+        ) -> None:
+        """Store a runReturnScore result, evicting the least recently used entry when the cache is full"""
+        score_cache = self._score_cache
+        score_cache[key] = value
+        if len(score_cache) > self._score_cache_size:
+            score_cache.popitem(last=False)
+
+    def outOfBounds(
+        self,
+        points : ndarray
+        ) -> Union[bool,ndarray]:
+        """Check parameter sets against the min-max constraints of the procedure function parameters (see .getParameterBounds)
+        
+        Parameters:
+        -----------
+        points : ndarray
+
+            A parameter set (1D) or an array of parameter sets (2D)
+
+        Returns:
+        --------
+        True where any parameter is out of bounds : Union[bool,ndarray]
+        """
+        lower, upper = self.getParameterBounds()
+        return ((points < lower) | (points > upper)).any(axis=-1)
+
+    def scoreBatch(
+        self,
+        points : ndarray,
+        objective_function : Optional[str] = None, 
+        result_index : Optional[int] = None,
+        limit : Optional[bool] = None
+        ) -> List[float]:
+        """
+        Score parameter sets with a single call to procedure.runBatch. Out-of-bounds (when limit=True) and memoized parameter sets are resolved as in .runReturnScore and are not sent to the procedure. procedure.input and procedure.output_obs must be already loaded
+
+        Parameters:
+        -----------
+        points : ndarray
+
+            Parameter sets, array of shape (number of parameter sets, number of parameters)
+
+        objective_function : Optional[str] = None
+
+            Name of the objective function. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr'
+
+        result_index : Optional[int] = None
+
+            Index of the output to use to compute the objective function
+
+        limit : Optional[bool] = None
+
+            Give the penalty score to parameter sets outside the min-max constraints. Defaults to self.limit
+
+        Returns:
+        --------
+        objective function values : List[float]
+        """
+        objective_function = objective_function if objective_function is not None else self._objective_function
+        result_index = result_index if result_index is not None else self.result_index
+        limit = limit if limit is not None else self.limit
+        points = ascontiguousarray(points, dtype=self._dtype)
+        out_of_bounds = self.outOfBounds(points) if limit else [False] * len(points)
+        score_cache = self._score_cache
+        scores = [None] * len(points)
+        pending = []
+        for i, parameters_array in enumerate(points):
+            if out_of_bounds[i]:
+                scores[i] = self._penalty_score
+                continue
+            key = (parameters_array.tobytes(), objective_function, result_index, limit)
+            if key in score_cache:
+                score_cache.move_to_end(key)
+                scores[i] = score_cache[key]
+            else:
+                pending.append((i, key))
+        if len(pending):
+            values = self._procedure.runBatch(points[[i for i, _ in pending]], objective_function=objective_function, result_index=result_index, dtype=self._dtype)
+            for (i, key), value in zip(pending, values.tolist()):
+                scores[i] = value
+                self._cacheScore(key, value)
+        return scores
+
+    def scorePoints(
+        self,
+        points : List[list],
+        objective_function : Optional[str] = None, 
+        result_index : Optional[int] = None,
+        executor : Optional[ProcessPoolExecutor] = None,
+        limit : Optional[bool] = None
+        ) -> List[float]:
+        """
+        Runs procedure for each parameter set and returns the objective function values. procedure.input and procedure.output_obs must be already loaded
+
+        Parameters:
+        -----------
+        points : List[list]
+
+            Parameter sets
+
+        objective_function : Optional[str] = None
+
+            Name of the objective function. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr'
+
+        result_index : Optional[int] = None
+
+            Index of the output to use to compute the objective function
+
+        executor : Optional[ProcessPoolExecutor] = None
+
+            Evaluate the points concurrently in this executor (see .makeExecutor). If None, points are evaluated sequentially
+
+        limit : Optional[bool] = None
+
+            Give the penalty score to parameter sets outside the min-max constraints. Defaults to self.limit
+
+        Returns:
+        --------
+        objective function values : List[float]
+        """
+        if executor is None:
+            return [self.runReturnScore(parameters=p,objective_function=objective_function, result_index=result_index, limit=limit) for p in points]
+        return list(executor.map(_evalPoint, [(p, objective_function, result_index, limit) for p in points]))
+
+    def makeExecutor(
+        self,
+        workers : Optional[int] = None
+        ) -> Optional[ProcessPoolExecutor]:
+        """Create a process pool to evaluate simplex points concurrently. Each worker process receives a copy of this calibration, so procedure.input and procedure.output_obs must be already loaded. Returns None if workers is 1
+        
+        Parameters:
+        -----------
+        workers : Optional[int] = None
+
+            Number of worker processes. Defaults to self.workers
+
+        Returns:
+        --------
+        None or executor : Optional[ProcessPoolExecutor]
+        """
+        workers = workers if workers is not None else self.workers
+        if workers is None or workers <= 1:
+            return None
+        return ProcessPoolExecutor(max_workers=workers, initializer=_initWorker, initargs=(self,))
+
+    def simplexSignature(
+        self,
+        sigma : float,
+        limit : bool,
+        ranges : Optional[List[Tuple[float,float]]],
+        objective_function : str,
+        result_index : int
+        ) -> tuple:
+        """Hashable description of the arguments a simplex was generated and scored with"""
+        return (sigma, limit, tuple(map(tuple, ranges or ())), objective_function, result_index)
+
     def makeSimplex(
         self,
         inplace : bool = True, 
@@ -259,8 +615,9 @@ class Calibration:
         result_index : Optional[int] = None,
         sigma : Optional[float] = None,
         limit : Optional[bool] = None,
-        ranges : Optional[List[Tuple[float,float]]] = None
-        ) -> Union[None,List[Tuple[List[float],float]]]:
+        ranges : Optional[List[Tuple[float,float]]] = None,
+        workers : Optional[int] = None
+        ) -> Union[None,List[SimplexVertex]]:
         """Generate simplex
         
         Parameters:
@@ -288,10 +645,14 @@ class Calibration:
         ranges : List[Tuple[float,float]] = None
 
             Override default parameter ranges with these values. A list of length equal to the number of parameters of the procedure function (._procedure.function._parameters) where each element is a 2-tuple of floats (range_min, range_max)
+
+        workers : int = None
+
+            Number of worker processes used to evaluate the simplex points concurrently. Defaults to self.workers
         
         Returns:
         --------
-        None or simplex : Union[None,List[Tuple[List[float],float]]] 
+        None or simplex : Union[None,List[SimplexVertex]] 
 
             First element of each item is the parameter list. Second element is the obtained objective function value
         """
@@ -302,19 +663,30 @@ class Calibration:
         sigma = sigma if sigma is not None else self.sigma
         limit = limit if limit is not None else self.limit
         ranges = ranges if ranges is not None else self.ranges
-        points = self._procedure.function.makeSimplex(sigma=sigma, limit=limit, ranges=ranges)
-        simplex = list()
-        for i, p in enumerate(points):
-            score = self.runReturnScore(parameters=p,objective_function=objective_function, result_index=result_index)
+        points = ascontiguousarray(self._procedure.function.makeSimplex(sigma=sigma, limit=limit, ranges=ranges), dtype=self._dtype)
+        if points.ndim != 2:
+            raise ValueError("procedure function makeSimplex must return a list of parameter lists of equal length")
+        executor = self.makeExecutor(workers)
+        try:
+            if executor is None and self._batch_run:
+                scores = self.scoreBatch(points, objective_function=objective_function, result_index=result_index, limit=limit)
+            else:
+                scores = self.scorePoints(points, objective_function=objective_function, result_index=result_index, executor=executor, limit=limit)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        for i, score in enumerate(scores):
             if score is None:
                 raise Exception("Simplex item %i returned None to objective function %s" % (i, objective_function))
-            if isnan(score):
+            if isnan(float(score)):
                 raise Exception("Simplex item %i returned NaN to objective function %s" % (i, objective_function))
-            simplex.append( (p, score))
+        scores = fromiter(scores, dtype=float64, count=len(points))
         if inplace:
-            self._simplex = array(simplex,dtype=object)
+            self._simplex_points = points
+            self._simplex_scores = scores
+            self._simplex_sig = self.simplexSignature(sigma, limit, ranges, objective_function, result_index)
         else:
-            return simplex
+            return [SimplexVertex(p, score) for p, score in zip(points.tolist(), scores.tolist())]
 
     def downhillSimplex(
         self,
@@ -324,7 +696,16 @@ class Calibration:
         ranges : Optional[List[Tuple[float,float]]] = None,
         no_improve_thr : Optional[float] = None, 
         max_stagnations : Optional[int] = None, 
-        max_iter : Optional[int] = None
+        max_iter : Optional[int] = None,
+        executor : Optional[ProcessPoolExecutor] = None,
+        adaptive : Optional[bool] = None,
+        step_schedule : Optional[Callable] = None,
+        load : bool = True,
+        reuse_simplex : bool = True,
+        kappa_0 : Optional[float] = None,
+        grow : Optional[float] = None,
+        shrink : Optional[float] = None,
+        rng : Optional[Generator] = None
         ) -> Union[None,DownhillSimplex]:
         """
         Instantiate DownhillSimplex object. Every parameter is optional. If missing or None, the corresponding instance property is used.
@@ -358,6 +739,42 @@ class Calibration:
         max_iter : int = None
 
             maximum iterations
+
+        executor : ProcessPoolExecutor = None
+
+            Score the simplex points concurrently in this executor (see .makeExecutor). If None, points are scored sequentially
+
+        adaptive : bool = None
+
+            Use dimension-dependent Nelder-Mead coefficients (Gao & Han, 2012)
+
+        step_schedule : Callable = None
+
+            Update the reflection and expansion step factor after each iteration (see downhill_simplex.StepSchedule). If None, one is made from kappa_0, grow and shrink
+
+        load : bool = True
+
+            Load the procedure input and observed output. If False, they must be already loaded
+
+        reuse_simplex : bool = True
+
+            If a simplex was already generated with .makeSimplex using the same sigma, limit, ranges, objective function and result index, start from it instead of generating and scoring a new one
+
+        kappa_0 : float = None
+
+            Maximum step factor of the step schedule. If None (and .kappa_0 is None), the steps are constant
+
+        grow : float = None
+
+            Step schedule grow exponent
+
+        shrink : float = None
+
+            Step schedule shrink exponent
+
+        rng : Generator = None
+
+            Random number generator for the initial simplex (numpy.random.default_rng). If None, the global numpy.random state is used
         
         Returns:
         --------
@@ -365,27 +782,76 @@ class Calibration:
         sigma = sigma if sigma is not None else self.sigma
         limit = limit if limit is not None else self.limit
         ranges = ranges if ranges is not None else self.ranges
-        points = self._procedure.function.makeSimplex(
-            sigma=sigma, 
-            limit=limit, 
-            ranges=ranges
-        )
+        if reuse_simplex and self._simplex_points is not None and self._simplex_sig == self.simplexSignature(sigma, limit, ranges, self.objective_function, self.result_index):
+            points = self._simplex_points.tolist()
+            initial_scores = self._simplex_scores.tolist()
+        else:
+            points = ascontiguousarray(self._procedure.function.makeSimplex(
+                sigma=sigma, 
+                limit=limit, 
+                ranges=ranges,
+                rng=rng
+            ), dtype=self._dtype)
+            initial_scores = None
         no_improve_thr = no_improve_thr if no_improve_thr is not None else self.no_improve_thr
         max_stagnations = max_stagnations if max_stagnations is not None else self.max_stagnations
         max_iter = max_iter if max_iter is not None else self.max_iter
-        self._procedure.loadInput()
-        self._procedure.loadOutputObs()
+        adaptive = adaptive if adaptive is not None else self.adaptive
+        kappa_0 = kappa_0 if kappa_0 is not None else self.kappa_0
+        if step_schedule is None and kappa_0 is not None:
+            step_schedule = make_step_schedule(
+                kappa_0, 
+                grow=grow if grow is not None else self.grow, 
+                shrink=shrink if shrink is not None else self.shrink)
+        coefficients = adaptive_coefficients(len(self._procedure.function._parameters)) if adaptive else {}
+        if load:
+            self._procedure.loadInput()
+            self._procedure.loadOutputObs()
+            self._procedure.prepareStatisticsCache()
         downhill_simplex = DownhillSimplex(
-            self.runReturnScore, 
+            partial(self.runReturnScore, limit=limit), 
             points, 
             no_improve_thr=no_improve_thr, 
             max_stagnations=max_stagnations, 
-            max_iter=max_iter
+            max_iter=max_iter,
+            map_f=(lambda pts: self.scorePoints(pts, executor=executor, limit=limit)) if executor is not None else None,
+            step_schedule=step_schedule,
+            initial_scores=initial_scores,
+            **coefficients
         )
         if inplace:
             self._downhill_simplex = downhill_simplex
         else:
             return downhill_simplex
+    def runStart(
+        self,
+        seed : Optional[int] = None,
+        **kwargs
+        ) -> Tuple[List[float],float]:
+        """
+        Run one downhill simplex start from a random initial simplex. Procedure input and observed output must be already loaded
+
+        Parameters:
+        -----------
+        seed : int = None
+
+            Seed of the random number generator of the initial simplex. The generator is local to this start, so the global numpy.random state is left untouched
+
+        **kwargs
+
+            Passed to .downhillSimplex (sigma, limit, ranges, no_improve_thr, max_stagnations, max_iter, step_schedule)
+
+        Returns:
+        --------
+        calibration result : Tuple[List[float],float]
+
+            First element is the list of calibrated parameters. Second element is the obtained objective function value
+        """
+        downhill_simplex = self.downhillSimplex(inplace=False, load=False, reuse_simplex=False, rng=default_rng(seed), **kwargs)
+        params, score = downhill_simplex.run()
+        logger.debug("Downhill simplex start (seed %s) finished at iteration %i", seed, downhill_simplex.iters)
+        return (list(params), score)
+
     def run(
         self, 
         inplace : bool = True, 
@@ -395,7 +861,10 @@ class Calibration:
         no_improve_thr : Optional[float] = None, 
         max_stagnations : Optional[int] = None, 
         max_iter : Optional[int] = None,
-        save_result : Optional[str] = None
+        save_result : Optional[str] = None,
+        workers : Optional[int] = None,
+        step_schedule : Optional[Callable] = None,
+        multistart : Optional[int] = None
         ) -> Union[None,Tuple[List[float],float]]:
         """
         Execute calibration. Every parameter is optional. If missing or None, the corresponding instance property is used.
@@ -433,6 +902,18 @@ class Calibration:
         save_results : str = None
 
             Save the calibration result into this file
+
+        workers : int = None
+
+            Number of worker processes used to score the simplex points concurrently. Defaults to self.workers
+
+        step_schedule : Callable = None
+
+            Update the reflection and expansion step factor after each iteration (see downhill_simplex.StepSchedule). If None, one is made from .kappa_0, .grow and .shrink (constant steps if .kappa_0 is None)
+
+        multistart : int = None
+
+            Number of independent downhill simplex runs. Defaults to self.multistart. If workers > 1, the starts run concurrently (one per worker process) and the simplex points of each start are scored sequentially
         
         Returns:
         --------
@@ -440,26 +921,66 @@ class Calibration:
 
             First element is the list of calibrated parameters. Second element is the obtained objective function value
         """
-        self.downhillSimplex(
-            inplace=True, 
-            sigma=sigma,
-            limit=limit,
-            ranges=ranges,
-            no_improve_thr=no_improve_thr, 
-            max_stagnations=max_stagnations, 
-            max_iter=max_iter)
-        calibration_result = self._downhill_simplex.run()
-        logging.debug("Downhill simplex finished at iteration %i" % self._downhill_simplex.iters)
+        self._score_cache.clear()
+        multistart = multistart if multistart is not None else self.multistart
+        # worker processes are started on first use, i.e. after the procedure input is loaded
+        executor = self.makeExecutor(workers)
+        try:
+            if multistart is not None and multistart > 1:
+                self._procedure.loadInput()
+                self._procedure.loadOutputObs()
+                self._procedure.prepareStatisticsCache()
+                start_kwargs = {
+                    "sigma": sigma,
+                    "limit": limit,
+                    "ranges": ranges,
+                    "no_improve_thr": no_improve_thr, 
+                    "max_stagnations": max_stagnations, 
+                    "max_iter": max_iter,
+                    "step_schedule": step_schedule
+                }
+                # explicit seeds, so that forked worker processes don't share the random state
+                seeds = [int(x) for x in random.randint(0, 2**31 - 1, size=multistart)]
+                if executor is None:
+                    results = [self.runStart(seed, **start_kwargs) for seed in seeds]
+                else:
+                    results = list(executor.map(_runStart, [(seed, start_kwargs) for seed in seeds]))
+                self._multistart_results = results
+                calibration_result = min(results, key=lambda r: r[1])
+            else:
+                self.downhillSimplex(
+                    inplace=True, 
+                    sigma=sigma,
+                    limit=limit,
+                    ranges=ranges,
+                    no_improve_thr=no_improve_thr, 
+                    max_stagnations=max_stagnations, 
+                    max_iter=max_iter,
+                    executor=executor,
+                    step_schedule=step_schedule)
+                calibration_result = self._downhill_simplex.run()
+                logger.debug("Downhill simplex finished at iteration %i", self._downhill_simplex.iters)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        # the procedure output left by the last scored run may not be the calibrated one (memoized or penalized points, worker processes): run once more with the calibrated parameters, computing the full statistics set
+        self._procedure.run(
+            parameters=calibration_result[0], 
+            save_results="", 
+            load_input=False, 
+            load_output_obs=False,
+            dtype=self._dtype if self._dtype != float64 else None
+        )
         save_result = save_result if save_result is not None else self.save_result
         if save_result:
-            json.dump(
-                {
-                    "parameters": list(calibration_result[0]),
-                    "score": calibration_result[1]
-                },
-                open("%s/%s" % (os.environ["PYDRODELTA_DIR"], save_result),"w"),
-                indent=4
-            )
+            result = {
+                "parameters": [float(x) for x in calibration_result[0]],
+                "score": float(calibration_result[1])
+            }
+            if multistart is not None and multistart > 1:
+                result["starts"] = [{"parameters": [float(x) for x in r[0]], "score": float(r[1])} for r in self._multistart_results]
+            with (self._pydrodelta_dir / save_result).open("w") as f:
+                json.dump(result, f, indent=4)
         if inplace:
             self._calibration_result = (list(calibration_result[0]),calibration_result[1])
         else:
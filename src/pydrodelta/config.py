@@ -1,5 +1,6 @@
 import yaml
 import os
+import pandas
 
 def loadConfig():
     config_file = open("%s/config/config.yml" % os.environ["PYDRODELTA_DIR"]) # "src/pydrodelta/config/config.json")
@@ -17,3 +18,6 @@ def loadConfig():
     return config
 
 config = loadConfig()
+
+if config["copy_on_write"]:
+    pandas.options.mode.copy_on_write = True
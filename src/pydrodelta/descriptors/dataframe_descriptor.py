@@ -9,7 +9,10 @@ class DataFrameDescriptor:
         return instance.__dict__[self._name]
 
     def __set__(self, instance, value):
+        if value is None or type(value) is DataFrame or isinstance(value,DataFrame):
+            instance.__dict__[self._name] = value
+            return
         try:
-            instance.__dict__[self._name] = value if isinstance(value,DataFrame) else DataFrame(value) if value is not None else None
+            instance.__dict__[self._name] = DataFrame(value)
         except ValueError:
             raise ValueError(f'"{self._name}" must be a DataFrame or a DataFrame-coercible type') from None
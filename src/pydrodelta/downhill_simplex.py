@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # coding: UTF-8
 from __future__ import division
-from typing import Optional
+from typing import Optional, Callable, NamedTuple, Union, List
 
 '''
     Pure Python/Numpy implementation of the downhill simplex algorithm.
@@ -10,6 +10,11 @@ from typing import Optional
 
 import numpy as np
 
+class SimplexVertex(NamedTuple):
+    """A simplex vertex: parameter set and its score"""
+    params : Union[np.ndarray, List[float]]
+    score : float
+
 def generate_simplex(x0, step=0.1):
     """
     Create a simplex based at x0
@@ -23,6 +28,50 @@ def generate_simplex(x0, step=0.1):
 def make_simplex(x0, step=0.1):
     return np.array(list(generate_simplex(x0, step)))
 
+def adaptive_coefficients(n : int) -> dict:
+    """
+    Dimension-dependent reflection, expansion, contraction and reduction coefficients (Gao & Han, 2012, Implementing the Nelder-Mead simplex algorithm with adaptive parameters). Returned as DownhillSimplex keyword arguments for an n-parameter problem
+    """
+    return {
+        "refl": 1.,
+        "ext": 2. / n,
+        "cont": 0.75 - 1. / (2 * n),
+        "red": 1. - 1. / n
+    }
+
+class StepSchedule:
+    """
+    Step size schedule for DownhillSimplex. The step factor kappa multiplies the reflection and expansion steps (kappa=1 is the standard Nelder-Mead step) and starts at kappa_0. After each iteration:
+        - if the best score improved: kappa = min(kappa_0, kappa ** grow)
+        - after reject_after consecutive iterations without improvement: kappa = kappa ** reject
+        - after shrink_after consecutive iterations without improvement: kappa = kappa ** shrink
+    With kappa_0 >= 1 and the default exponents, kappa grows back to kappa_0 while steps are accepted and decays towards 1 (the standard step) on slow steps. Contraction and reduction keep their coefficients: they already shrink the simplex. Instances are picklable, so they can be sent to worker processes
+    """
+    def __init__(self, kappa_0 : float = 2., grow : float = 2., shrink : float = 0.5, reject : float = 0.25, shrink_after : int = 3, reject_after : int = 15):
+        if kappa_0 < 1:
+            raise ValueError("kappa_0 must be greater or equal to 1")
+        self.kappa_0 = kappa_0
+        self.grow = grow
+        self.shrink = shrink
+        self.reject = reject
+        self.shrink_after = shrink_after
+        self.reject_after = reject_after
+
+    def __call__(self, kappa : float, improved : bool, slow_steps : int) -> float:
+        if improved:
+            return min(self.kappa_0, kappa ** self.grow)
+        if slow_steps >= self.reject_after:
+            return kappa ** self.reject
+        if slow_steps >= self.shrink_after:
+            return kappa ** self.shrink
+        return kappa
+
+def make_step_schedule(kappa_0 : float = 2., grow : float = 2., shrink : float = 0.5, reject : float = 0.25, shrink_after : int = 3, reject_after : int = 15) -> StepSchedule:
+    """
+    Create a step size schedule for DownhillSimplex (see StepSchedule). The schedule takes the current step factor kappa, whether the last iteration improved the best score and the number of consecutive iterations without improvement, and returns the new kappa. Note that reject_after only takes effect if max_stagnations is greater than it
+    """
+    return StepSchedule(kappa_0, grow, shrink, reject, shrink_after, reject_after)
+
 def centroid(points):
     """
     Compute the centroid of a list points given as an array.
@@ -44,7 +93,7 @@ class DownhillSimplex(object):
 
     max_iter=1000
     
-    def __init__(self, f, points,no_improve_thr:Optional[float]=None, max_stagnations:Optional[int]=None, max_iter:Optional[int]=None):
+    def __init__(self, f, points,no_improve_thr:Optional[float]=None, max_stagnations:Optional[int]=None, max_iter:Optional[int]=None, map_f:Optional[Callable]=None, refl:Optional[float]=None, ext:Optional[float]=None, cont:Optional[float]=None, red:Optional[float]=None, step_schedule:Optional[Callable]=None, initial_scores:Optional[List[float]]=None):
         '''
             f: (function): function to optimize, must return a scalar score 
                 and operate over a numpy array of the same dimensions as x_start
@@ -52,9 +101,28 @@ class DownhillSimplex(object):
             no_improve_thr (float): break after max_stagnations iterations with an improvement lower than no_improv_thr
             max_stagnations (int): break after max_stagnations iterations with an improvement lower than no_improv_thr
             max_iter: maximum iterations
+            map_f (function): optional, scores a list of points at once (e.g. concurrently). Must return the list of f values. Used to score the initial and reduced simplex
+            refl (float): reflection coefficient
+            ext (float): expansion coefficient, relative to the reflected point (ext=1 is the standard expansion)
+            cont (float): contraction coefficient
+            red (float): reduction (shrink) coefficient
+            step_schedule (function): optional, updates the reflection and expansion step factor after each iteration (see StepSchedule). If None, the step is constant
+            initial_scores (list): optional, f values of points. If set, the initial simplex is not scored again
         '''
         self.f = f
+        self.map_f = map_f
+        if refl is not None:
+            self.refl = refl
+        if ext is not None:
+            self.ext = ext
+        if cont is not None:
+            self.cont = cont
+        if red is not None:
+            self.red = red
+        self.step_schedule = step_schedule
+        self.kappa = getattr(step_schedule, "kappa_0", 1.) if step_schedule is not None else 1.
         self.points = points
+        self.initial_scores = initial_scores
         if no_improve_thr is not None:
             self.no_improve_thr = no_improve_thr
         if max_stagnations is not None:
@@ -68,9 +136,9 @@ class DownhillSimplex(object):
         pts = np.array([tup[0] for tup in res[:-1]])
         x0 = centroid(pts)
 
-        new_res = self.reflection(res, x0, self.refl)
+        new_res = self.reflection(res, x0, self.refl * self.kappa)
         if new_res is not None:
-            exp_res = self.expansion(new_res, x0, self.ext)
+            exp_res = self.expansion(new_res, x0, self.ext * self.kappa)
             if exp_res is not None:
                 new_res = exp_res
         else:
@@ -81,28 +149,42 @@ class DownhillSimplex(object):
 
     def run(self):
         # initialize
-        self.prev_best = self.f(self.points[0])
         self.stagnations = 0
-        res = self.make_score(self.points)
+        if self.initial_scores is not None:
+            res = [SimplexVertex(p, score) for p, score in zip(self.points, self.initial_scores)]
+            self.prev_best = res[0].score
+        else:
+            self.prev_best = self.f(self.points[0])
+            res = self.make_score(self.points)
+
+        sort = self.sort
+        step = self.step
+        step_schedule = self.step_schedule
+        no_improve_thr = self.no_improve_thr
+        max_stagnations = self.max_stagnations
 
         # simplex iter
         for iters in range(self.max_iter):
             self.iters = iters
-            res = self.sort(res)
-            best = res[0][1]
+            res = sort(res)
+            best = res[0].score
 
             # break after max_stagnations iterations with no improvement
-            if best < self.prev_best - self.no_improve_thr:
+            improved = best < self.prev_best - no_improve_thr
+            if improved:
                 self.stagnations = 0
                 self.prev_best = best
             else:
                 self.stagnations += 1
+
+            if step_schedule is not None:
+                self.kappa = step_schedule(self.kappa, improved, self.stagnations)
         
-            if self.stagnations >= self.max_stagnations:
+            if self.stagnations >= max_stagnations:
                 return res[0]
 
             # Downhill-Simplex algorithm
-            new_res = self.step(res)
+            new_res = step(res)
 
             res = new_res
         else:
@@ -113,7 +195,8 @@ class DownhillSimplex(object):
         """
         Order the points according to their value.
         """
-        return sorted(res, key = lambda x: x[1])
+        order = np.argsort(np.fromiter((x.score for x in res), dtype=float, count=len(res)), kind="stable")
+        return [res[i] for i in order]
 
     def reflection(self, res, x0, refl):
         """
@@ -121,14 +204,14 @@ class DownhillSimplex(object):
         refl: refl = 1 is a standard reflection
         """
         # reflected point and score
-        xr = x0 + refl*(x0 - res[-1][0])
+        xr = x0 + refl*(x0 - res[-1].params)
         rscore = self.f(xr)
 
         new_res = res[:]
 
-        progress = rscore < new_res[-2][1]
+        progress = rscore < new_res[-2].score
         if progress: # if this is a progress, we keep it
-            new_res[-1] = (xr, rscore)
+            new_res[-1] = SimplexVertex(xr, rscore)
             return new_res
         return None
 
@@ -138,12 +221,12 @@ class DownhillSimplex(object):
         """
         xr, rscore = res[-1]
         # if it is the new best point, we try to expand
-        if rscore < res[0][1]:
+        if rscore < res[0].score:
             xe = xr + ext*(xr - x0)
             escore = self.f(xe)
             if escore < rscore:
                 new_res = res[:]
-                new_res[-1] = (xe, escore)
+                new_res[-1] = SimplexVertex(xe, escore)
                 return new_res
         return None
 
@@ -151,14 +234,14 @@ class DownhillSimplex(object):
         """
         cont: contraction parameter: should be between zero and one
         """
-        xc = x0 + cont*(res[-1][0] - x0)
+        xc = x0 + cont*(res[-1].params - x0)
         cscore = self.f(xc)
 
         new_res = res[:]
 
-        progress = cscore < new_res[-1][1]
+        progress = cscore < new_res[-1].score
         if progress:
-            new_res[-1] = (xc, cscore)
+            new_res[-1] = SimplexVertex(xc, cscore)
             return new_res
         return None
 
@@ -173,5 +256,7 @@ class DownhillSimplex(object):
         return new_res
 
     def make_score(self, points):
-        res = [(pt, self.f(pt)) for pt in points]
+        if self.map_f is not None:
+            return [SimplexVertex(pt, score) for pt, score in zip(points, self.map_f(points))]
+        res = [SimplexVertex(pt, self.f(pt)) for pt in points]
         return res
@@ -1,5 +1,6 @@
 from numpy import random
-from typing import Tuple
+from numpy.random import Generator
+from typing import Tuple, Optional
 from .descriptors.string_descriptor import StringDescriptor
 from .descriptors.float_descriptor import FloatDescriptor
 
@@ -58,7 +59,8 @@ class ModelParameter:
         sigma : float = 0.25,
         limit : bool = True,
         range_min : float = None,
-        range_max : float = None
+        range_max : float = None,
+        rng : Optional[Generator] = None
         ) -> float:
         """
         Generates random value using normal distribution centered between self.range_min and self.range_max
@@ -84,13 +86,17 @@ class ModelParameter:
 
             Override self.range_max
 
+        rng : Optional[Generator] = None
+
+            Random number generator (numpy.random.default_rng). If None, the global numpy.random state is used
+
         Returns:
         --------
         float
         """
         range_min = range_min if range_min is not None else self.range_min
         range_max = range_max if range_max is not None else self.range_max
-        rand = range_min + random.normal(0.5,sigma) * (range_max - range_min)
+        rand = range_min + (rng if rng is not None else random).normal(0.5,sigma) * (range_max - range_min)
         if limit:
             return self.min if rand < self.min else rand if rand < self.max else self.max
         else:
@@ -11,9 +11,50 @@ import pandas
 import json
 from datetime import datetime, timedelta
 import isodate
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Iterable, Sequence
+from io import StringIO
+from itertools import chain
+from operator import methodcaller
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pandas import DatetimeIndex, DataFrame
 
+def _framesToCSV(
+    frames : Iterable[DataFrame],
+    include_header : bool = True,
+    empty_columns : dict = None
+    ) -> str:
+    """Write frames one after another as a single csv string, without concatenating them first. None items are skipped. Frames must have the same columns
+    
+    Parameters:
+    -----------
+    frames : Iterable[DataFrame]
+        Observations frames
+    
+    include_header : bool = True
+        Add a header row
+    
+    empty_columns : dict = None
+        Extra columns of the empty observations frame written when there are no frames
+
+    Returns:
+    --------
+    csv string : str
+    """
+    buffer = StringIO()
+    empty = True
+    for frame in frames:
+        if frame is None:
+            continue
+        frame.to_csv(buffer, header=include_header and empty)
+        empty = False
+    if empty:
+        return createEmptyObsDataFrame(extra_columns=empty_columns).to_csv(header=include_header)
+    return buffer.getvalue()
+
+# nodes share a handful of distinct time intervals/offsets, so the ISO-8601 strings are memoized
+_duration_isoformat = lru_cache(maxsize=256)(isodate.duration_isoformat)
+
 class Node:
     id = IntDescriptor()
     """Numeric identifier of the node"""
@@ -40,12 +81,20 @@ class Node:
     @variables.setter
     def variables(self,variables : List[Union[DerivedNodeVariable,ObservedNodeVariable,dict]] = None):
         self._variables = {}
-        if variables is not None:
-            for variable in variables:
-                if isinstance(variable, (DerivedNodeVariable,ObservedNodeVariable)):
-                    self._variables[variable["id"]] = variable
-                else:
-                    self._variables[variable["id"]] = DerivedNodeVariable(node=self,**variable) if "derived" in variable and variable["derived"] == True else ObservedNodeVariable(node=self,**variable)
+        if not variables:
+            self._variables_tuple = ()
+            self._observed_variables = ()
+            self._derived_variables = ()
+            return
+        for variable in variables:
+            if isinstance(variable, (DerivedNodeVariable,ObservedNodeVariable)):
+                self._variables[variable["id"]] = variable
+            else:
+                variable_class = DerivedNodeVariable if variable.get("derived") == True else ObservedNodeVariable
+                self._variables[variable["id"]] = variable_class(node=self,**variable)
+        self._variables_tuple = tuple(self._variables.values())
+        self._observed_variables = tuple(variable for variable in self._variables_tuple if isinstance(variable,ObservedNodeVariable))
+        self._derived_variables = tuple(variable for variable in self._variables_tuple if isinstance(variable,DerivedNodeVariable))
     node_type = StringDescriptor()
     """The type of node: either 'station' or 'basin'"""
     def __init__(
@@ -61,7 +110,7 @@ class Node:
             time_offset : timedelta = None,
             topology = None,
             hec_node : dict = None,
-            variables : List[Union[DerivedNodeVariable,ObservedNodeVariable]] = list(),
+            variables : List[Union[DerivedNodeVariable,ObservedNodeVariable]] = None,
             node_type : str = "station"
         ):
         """Nodes represent stations and basins. These nodes are identified with a node_id and must contain one or many variables each, which represent the hydrologic observed/simulated properties at that node (such as discharge, precipitation, etc.). They are identified with a variable_id and may contain one or many ordered series, which contain the timestamped values. If series are missing from a variable, it is assumed that observations are not available for said variable at said node. Additionally, series_prono may be defined to represent timeseries of said variable at said node that are originated by an external modelling procedure. If series are available, said series_prono may be automatically fitted to the observed data by means of a linear regression. Such a procedure may be useful to extend the temporal extent of the variable into the forecast horizon so as to cover the full time domain of the plan. Finally, one or many series_sim may be added and it is where simulated data (as a result of a procedure) will be stored. All series have a series_id identifier which is used to read/write data from data source whether it be an alerta5DBIO instance or a csv file.
@@ -101,7 +150,7 @@ class Node:
         hec_node : dict = None
             Mapping of this node to HECRAS geometry
         
-        variables : List[Union[DerivedNodeVariable,ObservedNodeVariable]] = list()
+        variables : List[Union[DerivedNodeVariable,ObservedNodeVariable]] = None
             The hydrologic observed/simulated properties at this node
 
         node_type : str = "station"
@@ -127,18 +176,50 @@ class Node:
         self._topology = topology
         self.variables = variables
         self.node_type = node_type
+        self._datetime_index = None
+        self._datetime_index_key = None
     
     def __repr__(self):
-        variables_repr = ", ".join([ "%i: Variable(id: %i, name: %s)" % (k,self.variables[k].id, self.variables[k].metadata["nombre"] if self.variables[k].metadata is not None else None) for k in self.variables.keys() ])
-        return "Node(id: %i, name: %s, variables: {%s})" % (self.id, self.name, variables_repr)
+        variables_repr = ", ".join([f"{k}: Variable(id: {variable.id}, name: {variable.metadata['nombre'] if variable.metadata is not None else None})" for k, variable in self._variables.items()])
+        return f"Node(id: {self.id}, name: {self.name}, variables: {{{variables_repr}}})"
     
+    def _forEachVariable(
+        self,
+        variables : Sequence[Union[ObservedNodeVariable,DerivedNodeVariable]],
+        method : str,
+        workers : int = 1,
+        *args,
+        **kwargs
+        ) -> None:
+        """Call method(*args, **kwargs) on each of variables. If workers > 1, variables are processed concurrently in a thread pool (variables are updated in place, so worker processes can't be used)"""
+        caller = methodcaller(method, *args, **kwargs)
+        if workers is None or workers <= 1 or len(variables) <= 1:
+            for variable in variables:
+                caller(variable)
+            return
+        with ThreadPoolExecutor(max_workers=min(workers, len(variables))) as executor:
+            # consume the results so that exceptions are raised
+            list(executor.map(caller, variables))
+
+    def _concatVariableFrames(
+        self,
+        method : str,
+        ignore_index : bool = False,
+        **kwargs
+        ) -> DataFrame:
+        """Call method(**kwargs) on each variable and concatenate the resulting frames in a single pass. Variables returning None are skipped. If there are no frames, returns an empty observations DataFrame"""
+        caller = methodcaller(method, **kwargs)
+        frames = [frame for frame in map(caller, self._variables_tuple) if frame is not None]
+        if not len(frames):
+            return createEmptyObsDataFrame()
+        return pandas.concat(frames, ignore_index=ignore_index, copy=False)
+
     def setOriginalData(self):
         """For each variable in .variables, set original data"""
-        for variable in self.variables.values():
-            variable.setOriginalData()
+        self._forEachVariable(self._variables_tuple, "setOriginalData")
     
     def toDict(self) -> dict:
-        """Convert node to dict"""
+        """Convert node to dict. hec_node is returned by reference (the setter already stores a copy of the input)"""
         return {
             "id": self.id,
             "tipo": self.tipo,
@@ -146,16 +227,25 @@ class Node:
             "timestart": self.timestart.isoformat() if self.timestart is not None else None,
             "timeend": self.timeend.isoformat() if self.timeend is not None else None,
             "forecast_timeend": self.forecast_timeend.isoformat() if self.forecast_timeend is not None else None,
-            "time_interval": isodate.duration_isoformat(self.time_interval) if self.time_interval is not None else None,
-            "time_offset": isodate.duration_isoformat(self.time_offset) if self.time_offset is not None else None,
-            "hec_node": dict(self.hec_node) if self.hec_node is not None else None,
-            "variables": [self.variables[key].toDict() for key in self.variables], 
+            "time_interval": _duration_isoformat(self.time_interval) if self.time_interval is not None else None,
+            "time_offset": _duration_isoformat(self.time_offset) if self.time_offset is not None else None,
+            "hec_node": self.hec_node,
+            "variables": [variable.toDict() for variable in self._variables_tuple], 
             "node_type": self.node_type
         }
     
+    @property
+    def datetime_index(self) -> DatetimeIndex:
+        """Regular DatetimeIndex from .timestart to .timeend with step .time_interval and offset .time_offset. Built on first access and rebuilt only when any of these properties changes. Returns a (shallow) copy of the cached index, so that renaming or otherwise modifying it doesn't affect the node"""
+        key = (self.time_interval, self.timestart, self.timeend, self.time_offset)
+        if self._datetime_index is None or key != self._datetime_index_key:
+            self._datetime_index = createDatetimeSequence(timeInterval=key[0], timestart=key[1], timeend=key[2], timeOffset=key[3])
+            self._datetime_index_key = key
+        return self._datetime_index.copy()
+
     def createDatetimeIndex(self) -> DatetimeIndex:
-        """Create DatetimeIndex from .time_interval, .timestart, .timeend and .time_offset"""
-        return createDatetimeSequence(None, self.time_interval, self.timestart, self.timeend, self.time_offset)
+        """Create DatetimeIndex from .time_interval, .timestart, .timeend and .time_offset (see .datetime_index)"""
+        return self.datetime_index
     
     def toCSV(
             self,
@@ -177,10 +267,10 @@ class Node:
         --------
         csv string : str
         """
-        data = createEmptyObsDataFrame(extra_columns={"tag":"str","series_id":"int"} if include_series_id else {"tag":"str"})
-        for variable in self.variables.values():
-            data = pandas.concat([data,variable.getData(include_series_id=include_series_id)])
-        return data.to_csv(header=include_header)
+        return _framesToCSV(
+            (variable.getData(include_series_id=include_series_id) for variable in self._variables_tuple),
+            include_header=include_header,
+            empty_columns={"tag":"str","series_id":"int"} if include_series_id else {"tag":"str"})
     
     def outputToCSV(
             self,
@@ -198,10 +288,10 @@ class Node:
         --------
         csv string : csv
         """
-        data = createEmptyObsDataFrame(extra_columns={"tag":"str"})
-        for variable in self.variables.values():
-            data = data.join(variable.mergeOutputData())
-        return data.to_csv(header=include_header) # self.series[0].toCSV()
+        return _framesToCSV(
+            (variable.mergeOutputData() for variable in self._variables_tuple),
+            include_header=include_header,
+            empty_columns={"tag":"str"})
     
     def variablesToSeries(
             self,
@@ -223,7 +313,7 @@ class Node:
         --------
         list of Series : List[Serie]
         """
-        return [variable.toSerie(include_series_id=include_series_id,use_node_id=use_node_id) for variable in self.variables.values()]
+        return [variable.toSerie(include_series_id=include_series_id,use_node_id=use_node_id) for variable in self._variables_tuple]
     
     def variablesOutputToList(
             self,
@@ -241,12 +331,8 @@ class Node:
         --------
         list
         """
-        list = []
-        for variable in self.variables.values():
-            output_list = variable.outputToList(flatten=flatten)
-            if output_list is not None:
-                list.extend(output_list)
-        return list
+        output_lists = (variable.outputToList(flatten=flatten) for variable in self._variables_tuple)
+        return list(chain.from_iterable(output_list for output_list in output_lists if output_list is not None))
     
     def variablesPronoToList(
             self,
@@ -264,17 +350,14 @@ class Node:
         --------
         list
         """
-        list = []
-        for variable in self.variables.values():
-            pronolist = variable.pronoToList(flatten=flatten)
-            if pronolist is not None:
-                list.extend(pronolist)
-        return list
+        pronolists = (variable.pronoToList(flatten=flatten) for variable in self._variables_tuple)
+        return list(chain.from_iterable(pronolist for pronolist in pronolists if pronolist is not None))
     
     def adjust(
         self,
         plot : bool = True,
-        error_band : bool = True
+        error_band : bool = True,
+        workers : int = 1
         ) -> None:
         """For each variable in .variables, if adjust_from is set, run .adjust()
         
@@ -284,10 +367,11 @@ class Node:
             Generate plot
         
         error_band : bool = True
-            Add 01-99 error band to result data"""
-        for variable in self.variables.values():
-            if variable.adjust_from is not None:
-                variable.adjust(plot,error_band)
+            Add 01-99 error band to result data
+        
+        workers : int = 1
+            Number of threads used to process variables concurrently. Ignored if plot=True: pyplot figure state is global and not thread-safe, so plotting variables are processed sequentially"""
+        self._forEachVariable([variable for variable in self._variables_tuple if variable.adjust_from is not None], "adjust", 1 if plot else workers, plot, error_band)
     
     def apply_linear_combination(
         self,
@@ -303,28 +387,24 @@ class Node:
         
         series_index : int = 0
             Index of the series to apply the linear combination"""
-        for variable in self.variables.values():
-            if variable.linear_combination is not None:
-                variable.apply_linear_combination(plot,series_index)
+        self._forEachVariable([variable for variable in self._variables_tuple if variable.linear_combination is not None], "apply_linear_combination", 1, plot, series_index)
     
     def adjustProno(
         self,
         error_band : bool = True
         ) -> None:
-        """For each variable in .variables run .adjustProno()
+        """For each variable in .variables run .adjustProno(). Variables are processed sequentially, since the adjustment plots its results (pyplot figure state is not thread-safe)
         
         Parameters:
         -----------
         error_band : bool = True
             Add 01-99 error band to result data"""
-        for variable in self.variables.values():
-            variable.adjustProno(error_band=error_band)
+        self._forEachVariable(self._variables_tuple, "adjustProno", error_band=error_band)
     
     def setOutputData(self) -> None:
         """For each variable in .variables run setOutputData()
         """
-        for variable in self.variables.values():
-            variable.setOutputData()
+        self._forEachVariable(self._variables_tuple, "setOutputData")
     
     def uploadData(
         self,
@@ -351,7 +431,7 @@ class Node:
             - proxy_dict : dict
         """
         created = []
-        for variable in self.variables.values():
+        for variable in self._variables_tuple:
             result = variable.uploadData(
                 include_prono = include_prono,
                 api_config = api_config)
@@ -373,10 +453,10 @@ class Node:
         --------
         joined, pivoted data : DataFrame
         """
-        data = createEmptyObsDataFrame()
-        for variable in self.variables.values():
-            data = data.join(variable.pivotData(include_prono=include_prono))
-        return data
+        frames = [variable.pivotData(include_prono=include_prono) for variable in self._variables_tuple]
+        if not len(frames):
+            return createEmptyObsDataFrame()
+        return frames[0].join(frames[1:], how="outer") if len(frames) > 1 else frames[0]
     
     def pivotOutputData(
         self,
@@ -393,10 +473,10 @@ class Node:
         --------
         joined, pivoted data : DataFrame
         """
-        data = createEmptyObsDataFrame()
-        for variable in self.variables.values():
-            data = data.join(variable.pivotOutputData(include_tag=include_tag))
-        return data
+        frames = [variable.pivotOutputData(include_tag=include_tag) for variable in self._variables_tuple]
+        if not len(frames):
+            return createEmptyObsDataFrame()
+        return frames[0].join(frames[1:], how="outer") if len(frames) > 1 else frames[0]
     
     def seriesToDataFrame(
         self,
@@ -420,9 +500,7 @@ class Node:
         if pivot:
             data = self.pivotData(include_prono)
         else:
-            data = createEmptyObsDataFrame()
-            for variable in self.variables.values():
-                data = data.append(variable.seriesToDataFrame(include_prono=include_prono),ignore_index=True)
+            data = self._concatVariableFrames("seriesToDataFrame", ignore_index=True, include_prono=include_prono)
         return data
     
     def saveSeries(
@@ -471,18 +549,15 @@ class Node:
         None or DataFrame
         """
         if inline:
-            for variable in self.variables.values():
-                variable.concatenateProno(inline=True,ignore_warmup=ignore_warmup)
+            self._forEachVariable(self._variables_tuple, "concatenateProno", inline=True, ignore_warmup=ignore_warmup)
         else:
-            data = createEmptyObsDataFrame()
-            for variable in self.variables.values():
-                data = data.append(variable.concatenateProno(inline=False,ignore_warmup=ignore_warmup))
-            return data
+            return self._concatVariableFrames("concatenateProno", inline=False, ignore_warmup=ignore_warmup)
     
     def interpolate(
         self,
         limit : timedelta = None,
-        extrapolate : bool = None
+        extrapolate : bool = None,
+        workers : int = 1
         ) -> None:
         """Join every variable in .variables, run .interpolate().
         
@@ -493,16 +568,17 @@ class Node:
         
         extrapolate : bool = None
             If true, extrapolate data up to a distance of limit
+        
+        workers : int = 1
+            Number of threads used to process variables concurrently
         """
-        for variable in self.variables.values():
-                variable.interpolate(limit=limit,extrapolate=extrapolate)
+        self._forEachVariable(self._variables_tuple, "interpolate", workers, limit=limit, extrapolate=extrapolate)
     
     def plot(self) -> None:
         """
-        For each variable of .variables run .plot()
+        For each variable of .variables run .plot(). Variables are plotted sequentially: pyplot figure state is global and not thread-safe
         """
-        for variable in self.variables.values():
-            variable.plot()
+        self._forEachVariable(self._variables_tuple, "plot")
     
     def plotProno(
         self,
@@ -531,7 +607,7 @@ class Node:
         xlim : tuple = None
         ) -> None:
         """
-        For each variable in .variables run .plotProno()
+        For each variable in .variables run .plotProno(). Variables are plotted sequentially: pyplot figure state is global and not thread-safe
 
         Parameters:
         -----------
@@ -604,8 +680,7 @@ class Node:
         xlim : tuple = None
             Range of x axis (min, max)
         """
-        for variable in self.variables.values():
-            variable.plotProno(output_dir=output_dir,figsize=figsize,title=title,markersize=markersize,obs_label=obs_label,tz=tz,prono_label=prono_label,footnote=footnote,errorBandLabel=errorBandLabel,obsLine=obsLine,prono_annotation=prono_annotation,obs_annotation=obs_annotation,forecast_date_annotation=forecast_date_annotation,ylim=ylim,station_name=station_name,ydisplay=ydisplay,text_xoffset=text_xoffset,xytext=xytext,datum_template_string=datum_template_string,title_template_string=title_template_string,x_label=x_label,y_label=y_label,xlim=xlim)
+        self._forEachVariable(self._variables_tuple, "plotProno", output_dir=output_dir,figsize=figsize,title=title,markersize=markersize,obs_label=obs_label,tz=tz,prono_label=prono_label,footnote=footnote,errorBandLabel=errorBandLabel,obsLine=obsLine,prono_annotation=prono_annotation,obs_annotation=obs_annotation,forecast_date_annotation=forecast_date_annotation,ylim=ylim,station_name=station_name,ydisplay=ydisplay,text_xoffset=text_xoffset,xytext=xytext,datum_template_string=datum_template_string,title_template_string=title_template_string,x_label=x_label,y_label=y_label,xlim=xlim)
     
     def loadData(
         self,
@@ -613,7 +688,10 @@ class Node:
         timeend : Union[datetime,str,dict],
         include_prono : bool = True,
         forecast_timeend : Union[datetime,str,dict] = None,
-        input_api_config : dict = None
+        input_api_config : dict = None,
+        workers : int = 1,
+        series_workers : int = 1,
+        keep_original : bool = False
         ) -> None:
         """
         For each variable in variables, if variable is an ObservedNodeVariable run .loadData()
@@ -639,15 +717,27 @@ class Node:
             - url : str
             - token : str
             - proxy_dict : dict
-        """
-        for variable in self.variables.values():
-            if isinstance(variable,ObservedNodeVariable):
-                variable.loadData(
-                    timestart,
-                    timeend,
-                    include_prono,
-                    forecast_timeend,
-                    input_api_config)
+        
+        workers : int = 1
+            Number of threads used to load variables concurrently
+        
+        series_workers : int = 1
+            Number of threads used by each variable to load its series concurrently
+        
+        keep_original : bool = False
+            Save a copy of the loaded data of each serie into its .original_data. Before, series always kept this copy; it is now made only on request
+        """
+        self._forEachVariable(
+            self._observed_variables,
+            "loadData",
+            workers,
+            timestart,
+            timeend,
+            include_prono,
+            forecast_timeend,
+            input_api_config,
+            series_workers,
+            keep_original)
     def removeOutliers(self) -> bool:
         """
         For each variable of .variables, if variable is an ObservedNodeVariable, run .removeOutliers(). Removes outilers and returns True if any outliers were removed
@@ -655,12 +745,8 @@ class Node:
         Returns:
         --------
         bool"""
-        found_outliers = False
-        for variable in self.variables.values():
-            if isinstance(variable,ObservedNodeVariable):
-                found_outliers_ = variable.removeOutliers()
-                found_outliers = found_outliers_ if found_outliers_ else found_outliers
-        return found_outliers
+        # every variable must be cleaned, so results are collected before folding
+        return any([variable.removeOutliers() for variable in self._observed_variables])
     def detectJumps(self) -> bool:
         """
         For each variable of .variables, if variable is an ObservedNodeVariable, run .detectJumps(). Returns True if any jumps were found
@@ -668,19 +754,13 @@ class Node:
         Returns:
         --------
         bool"""
-        found_jumps = False
-        for variable in self.variables.values():
-            if isinstance(variable,ObservedNodeVariable):
-                found_jumps_ = variable.detectJumps()
-                found_jumps = found_jumps_ if found_jumps_ else found_jumps
-        return found_jumps
+        # every variable must be checked, so results are collected before folding
+        return any([variable.detectJumps() for variable in self._observed_variables])
     def applyOffset(self) -> None:
         """
         For each variable of .variables, if variable is an ObservedNodeVariable, run .applyOffset()
         """
-        for variable in self.variables.values():
-            if isinstance(variable,ObservedNodeVariable):
-                variable.applyOffset()
+        self._forEachVariable(self._observed_variables, "applyOffset")
     def regularize(
         self,
         interpolate : bool = False
@@ -693,9 +773,7 @@ class Node:
         interpolate : bool = False
             Interpolate missing values
         """
-        for variable in self.variables.values():
-            if isinstance(variable,ObservedNodeVariable):
-                variable.regularize(interpolate=interpolate)
+        self._forEachVariable(self._observed_variables, "regularize", interpolate=interpolate)
     def fillNulls(
         self,
         inline : bool =True,
@@ -712,15 +790,18 @@ class Node:
         fill_value : float = None
             Fill missing values with this value
         """
-        for variable in self.variables.values():
-            if isinstance(variable,ObservedNodeVariable):
-                variable.fillNulls(inline,fill_value)
+        self._forEachVariable(self._observed_variables, "fillNulls", 1, inline, fill_value)
     def derive(self) -> None:
         """For each variable of .variables, if variable is a DerivedNodeVariable, run .derive()"""
-        for variable in self.variables.values():
-            if isinstance(variable,DerivedNodeVariable):
-                variable.derive()
-    def applyMovingAverage(self) -> None:
-        """For each variable of .variables fun applyMovingAverage()"""
-        for variable in self.variables.values():
-            variable.applyMovingAverage()
+        self._forEachVariable(self._derived_variables, "derive")
+    def applyMovingAverage(
+        self,
+        workers : int = 1
+        ) -> None:
+        """For each variable of .variables fun applyMovingAverage()
+        
+        Parameters:
+        -----------
+        workers : int = 1
+            Number of threads used to process variables concurrently"""
+        self._forEachVariable(self._variables_tuple, "applyMovingAverage", workers)
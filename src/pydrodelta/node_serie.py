@@ -1,9 +1,13 @@
 from datetime import timedelta, datetime 
 import pydrodelta.util as util
 import os
+import json
 import logging
+from itertools import repeat
+from functools import lru_cache
 from .a5 import createEmptyObsDataFrame, observacionesListToDataFrame, Crud
 from pandas import isna, DataFrame
+from numpy import isnan, full, where
 from .config import config
 from typing import Union, List, Tuple
 from .types.tvp import TVP
@@ -20,6 +24,20 @@ from .descriptors.dataframe_descriptor import DataFrameDescriptor
 input_crud = Crud(**config["input_api"])
 # output_crud = Crud(**config["output_api"])
 
+@lru_cache(maxsize=32)
+def _cachedCrud(api_config_json : str) -> Crud:
+    return Crud(**json.loads(api_config_json))
+
+def _getCrud(api_config : dict) -> Crud:
+    """Return a Crud for api_config, reusing the instance (and its http session) created for an equal config"""
+    return _cachedCrud(json.dumps(api_config, sort_keys=True))
+
+_SERIES_TABLES = {
+    "puntual": "series",
+    "areal": "series_areal",
+    "raster": "series_rast"
+}
+
 class NodeSerie():
     """Represents a timestamped series of observed or simulated values for a variable in a node. """
     
@@ -72,6 +90,9 @@ class NodeSerie():
     jumps_data = DataFrameDescriptor()
     """Data rows containing detected jumps"""
     
+    original_data = DataFrameDescriptor()
+    """Copy of the data as loaded from source (only if loadData was called with keep_original=True)"""
+    
     csv_file = StringDescriptor()
     """Read data from this csv file. The csv file must have one column for the timestamps called 'timestart' and one column per series of data with the series_id in the header"""
     
@@ -153,6 +174,7 @@ class NodeSerie():
         self.metadata = None
         self.outliers_data = None
         self.jumps_data = None
+        self.original_data = None
         self.csv_file = "%s/%s" % (os.environ["PYDRODELTA_DIR"],csv_file) if csv_file is not None else None
         self.observations = observations
         self.save_post = save_post
@@ -172,7 +194,7 @@ class NodeSerie():
             "x_offset": self.x_offset,
             "y_offset": self.y_offset,
             "moving_average": self.moving_average,
-            "data": self.data.reset_index().values.tolist() if self.data is not None else None,
+            "data": [list(row) for row in zip(self.data.index.tolist(), *(self.data[column].tolist() for column in self.data.columns))] if self.data is not None else None,
             "metadata": self.metadata,
             "outliers_data": self.outliers_data,
             "jumps_data": self.jumps_data
@@ -182,7 +204,8 @@ class NodeSerie():
         self,
         timestart : datetime,
         timeend : datetime,
-        input_api_config : dict = None
+        input_api_config : dict = None,
+        keep_original : bool = False
         ) -> None:
         """Load data from source according to configuration. 
         
@@ -206,13 +229,16 @@ class NodeSerie():
             - url : str
             - token : str
             - proxy_dict : dict
+        
+        keep_original : bool = False
+            Save a copy of the loaded data into .original_data. Before, the copy was always made (api data); it is now made only on request
         """
         timestart = util.tryParseAndLocalizeDate(timestart)
         timeend = util.tryParseAndLocalizeDate(timeend)
         if(self.observations is not None):
             logging.debug("Load data for series_id: %i from configuration" % (self.series_id))
             data = observacionesListToDataFrame(self.observations,tag="obs")
-            self.data = data[(data.index >= timestart) & (data.index <= timeend)]
+            self.data = data.loc[timestart:timeend]
             self.metadata = {"id": self.series_id, "tipo": self.type}
         elif(self.csv_file is not None):
             logging.debug("Load data for series_id: %i from file %s" % (self.series_id, self.csv_file))
@@ -221,15 +247,16 @@ class NodeSerie():
             self.metadata = {"id": self.series_id, "tipo": self.type}
         else:
             logging.debug("Load data for series_id: %i [%s to %s] from a5 api" % (self.series_id,timestart.isoformat(),timeend.isoformat()))
-            crud = Crud(**input_api_config) if input_api_config is not None else input_crud
+            crud = _getCrud(input_api_config) if input_api_config is not None else input_crud
             self.metadata = crud.readSerie(self.series_id,timestart,timeend,tipo=self.type)
             if len(self.metadata["observaciones"]):
                 self.data = observacionesListToDataFrame(self.metadata["observaciones"],tag="obs")
             else:
                 logging.warning("No data found for series_id=%i" % self.series_id)
                 self.data = createEmptyObsDataFrame(extra_columns={"tag":"str"})
-            self.original_data = self.data.copy(deep=True)
             del self.metadata["observaciones"]
+        if keep_original:
+            self.original_data = self.data.copy(deep=True)
     
     def getThresholds(self) -> dict:
         """Read level threshold information from .metadata"""
@@ -271,24 +298,24 @@ class NodeSerie():
             # self.data["valor"] = util.serieMovingAverage(self.data,self.moving_average)
             self.data = util.serieMovingAverage(self.data,self.moving_average,tag_column = "tag")
     
-    def applyTimedeltaOffset(
-        self,
-        row,
-        x_offset) -> datetime:
-        return row.name + x_offset
-    
     def applyOffset(self) -> None:
         """Applies .x_offset (time axis) and .y_offset (values axis) to the data"""
+        x_noop = self.x_offset == timedelta(0) if isinstance(self.x_offset,timedelta) else self.x_offset == 0
+        if x_noop and self.y_offset == 0:
+            return
         if self.data is None:
             logging.warn("applyOffset: self.data is None")
             return
         if not len(self.data):
             logging.warn("applyOffset: self.data is empty")
             return
-        if isinstance(self.x_offset,timedelta):
-            self.data.index = self.data.apply(lambda row: row.name + self.x_offset, axis=1) # self.applyTimedeltaOffset(row,self.x_offset), axis=1) # for x in self.data.index]
-            self.data.index.rename("timestart",inplace=True)
-        elif self.x_offset != 0:
+        if x_noop:
+            logging.debug("applyOffset: x_offset is zero, index left untouched")
+        elif isinstance(self.x_offset,timedelta):
+            new_index = self.data.index + self.x_offset
+            new_index.name = "timestart"
+            self.data.index = new_index
+        else:
             self.data["valor"] = self.data["valor"].shift(self.x_offset, axis = 0) 
             self.data["tag"] = self.data["tag"].shift(self.x_offset, axis = 0) 
         if self.y_offset != 0:
@@ -377,9 +404,7 @@ class NodeSerie():
         include_series_id : bool = False
             Add a column with series_id"""
         if include_series_id:
-            data = self.data
-            data["series_id"] = self.series_id
-            return data.to_csv()
+            return self.data.assign(series_id=self.series_id).to_csv()
         return self.data.to_csv()
     
     def toList(
@@ -410,19 +435,36 @@ class NodeSerie():
         list of time-value pair dicts : List[TVP]"""
         if self.data is None:
             return list()
-        data = self.data[self.data.index <= max_obs_date] if max_obs_date is not None else self.data.copy(deep=True)
-        data["timestart"] = data.index
-        data["timeend"] = [x + timeSupport for x in data["timestart"]] if timeSupport is not None else data["timestart"]
-        data["timestart"] = [x.isoformat() for x in data["timestart"]]
-        data["timeend"] = [x.isoformat() for x in data["timeend"]]
-        if include_series_id:
-            data["series_id"] = self.series_id
-        obs_list = data.to_dict(orient="records")
-        for obs in obs_list:
-            obs["valor"] = None if isna(obs["valor"]) else obs["valor"]
-            obs["tag"] = None if "tag" not in obs else None if isna(obs["tag"]) else obs["tag"]
+        data = self.data[self.data.index <= max_obs_date] if max_obs_date is not None else self.data
+        valor = data["valor"].to_numpy(dtype=float)
+        valor_isna = isnan(valor)
+        valores = valor.astype(object)
+        valores[valor_isna] = None
+        tags = where(isna(data["tag"]), None, data["tag"].to_numpy(dtype=object)) if "tag" in data.columns else full(len(data),None,dtype=object)
+        timestart = util.isoformatDatetimeIndex(data.index)
+        timeend = util.isoformatDatetimeIndex(data.index + timeSupport) if timeSupport is not None else timestart
+        extra_columns = [column for column in data.columns if column not in ("valor","tag")]
         if remove_nulls:
-            obs_list = [x for x in obs_list if x["valor"] is not None] # remove nulls
+            notnull = ~valor_isna
+            valores, tags, timestart, timeend = valores[notnull], tags[notnull], timestart[notnull], timeend[notnull]
+            if len(extra_columns):
+                data = data[notnull]
+        if len(extra_columns):
+            # pass any other columns through, with the record keys in the same order as DataFrame.to_dict(orient="records")
+            values = {"valor": valores.tolist(), "tag": tags.tolist()}
+            keys = list(data.columns) + ["timestart", "timeend"]
+            columns = [values[column] if column in values else data[column].tolist() for column in data.columns] + [timestart.tolist(), timeend.tolist()]
+            if include_series_id:
+                keys.append("series_id")
+                columns.append(repeat(self.series_id, len(data)))
+            if "tag" not in data.columns:
+                keys.append("tag")
+                columns.append(values["tag"])
+            return [dict(zip(keys, row)) for row in zip(*columns)]
+        if include_series_id:
+            obs_list = [{"valor": v, "tag": t, "timestart": ts, "timeend": te, "series_id": self.series_id} for v, t, ts, te in zip(valores.tolist(), tags.tolist(), timestart.tolist(), timeend.tolist())]
+        else:
+            obs_list = [{"valor": v, "tag": t, "timestart": ts, "timeend": te} for v, t, ts, te in zip(valores.tolist(), tags.tolist(), timestart.tolist(), timeend.tolist())]
         return obs_list
     
     def toDict(
@@ -462,4 +504,4 @@ class NodeSerie():
     
     def getSeriesTable(self) -> str:
         """Retrieve series table name (of a5 schema) for this timeseries"""
-        return "series" if self.type == "puntual" else "series_areal" if self.type == "areal" else "series_rast" if self.type == "raster" else "series"
\ No newline at end of file
+        return _SERIES_TABLES.get(self.type, "series")
\ No newline at end of file
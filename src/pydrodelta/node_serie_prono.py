@@ -1,4 +1,4 @@
-from pydrodelta.node_serie import NodeSerie
+from pydrodelta.node_serie import NodeSerie, _getCrud
 import logging
 from pydrodelta.a5 import Crud, observacionesListToDataFrame, createEmptyObsDataFrame
 from pydrodelta.node_serie_prono_metadata import NodeSeriePronoMetadata
@@ -57,7 +57,8 @@ class NodeSerieProno(NodeSerie):
         self,
         timestart : datetime,
         timeend : datetime,
-        input_api_config : dict = None
+        input_api_config : dict = None,
+        keep_original : bool = False
         ) -> None:
         """Load forecasted data from source (input api). Retrieves forecast from input api using series_id, cal_id, timestart, and timeend
         
@@ -75,16 +76,20 @@ class NodeSerieProno(NodeSerie):
             Properties:
             - url : str
             - token : str
-            - proxy_dict : dict"""
+            - proxy_dict : dict
+        
+        keep_original : bool = False
+            Save a copy of the loaded data into .original_data. Before, the copy was always made (api data); it is now made only on request"""
         logging.debug("Load prono data for series_id: %i, cal_id: %i, cor_id: %s" % (self.series_id, self.cal_id, str(self.cor_id) if self.cor_id is not None else "last"))
-        crud = Crud(**input_api_config) if input_api_config is not None else input_crud
+        crud = _getCrud(input_api_config) if input_api_config is not None else input_crud
         metadata = crud.readSerieProno(self.series_id,self.cal_id,timestart,timeend,qualifier=self.qualifier, cor_id = self.cor_id)
         if len(metadata["pronosticos"]):
             self.data = observacionesListToDataFrame(metadata["pronosticos"],tag="prono")
         else:
             logging.warning("No data found for series_id=%i, cal_id=%i" % (self.series_id, self.cal_id))
             self.data = createEmptyObsDataFrame()
-        self.original_data = self.data.copy(deep=True)
+        if keep_original:
+            self.original_data = self.data.copy(deep=True)
         del metadata["pronosticos"]
         self.metadata = metadata
     def setData(self,data):
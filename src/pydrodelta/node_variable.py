@@ -2,13 +2,16 @@ from .a5 import Crud, Serie
 from .node_serie import NodeSerie
 from .node_serie_prono import NodeSerieProno
 import os
-from .util import interval2timedelta, adjustSeries, linearCombination, adjustSeries, serieFillNulls, interpolateData, getParamOrDefaultTo, plot_prono
+from .util import interval2timedelta, adjustSeries, linearCombination, adjustSeries, serieFillNulls, interpolateData, getParamOrDefaultTo, plot_prono, isoformatDatetimeIndex
 import pandas
 import logging
 import json
+import orjson
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import isodate
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from .config import config
 from typing import List, Union, TypedDict
 from .descriptors.int_descriptor import IntDescriptor
@@ -23,6 +26,19 @@ from .descriptors.string_descriptor import StringDescriptor
 input_crud = Crud(**config["input_api"])
 output_crud = Crud(**config["output_api"])
 
+# variables share a handful of distinct time supports/intervals, so the ISO-8601 strings are memoized
+_duration_isoformat = lru_cache(maxsize=256)(isodate.duration_isoformat)
+
+def _dataFrameToRecords(data : pandas.DataFrame) -> List[dict]:
+    """Convert a time-indexed DataFrame to a list of records (dict) with the index as an ISO-formatted 'timestart'"""
+    records = data.reset_index()
+    records["timestart"] = isoformatDatetimeIndex(data.index) if "timestart" in records.columns else None
+    return records.to_dict("records")
+
+def _snapshot(data : pandas.DataFrame) -> pandas.DataFrame:
+    """Copy of data to keep as original_data. Under pandas Copy-on-Write a shallow copy is enough, since blocks are only duplicated when either side is written to"""
+    return data.copy(deep=not pandas.options.mode.copy_on_write)
+
 class AdjustFrom(TypedDict):
     truth: int
     sim: int
@@ -240,7 +256,7 @@ class NodeVariable:
     
     def setOriginalData(self):
         """copies .data into .original_data"""
-        self.original_data = self.data.copy(deep=True)
+        self.original_data = _snapshot(self.data)
     
     def toDict(self) -> dict:
         """Convert this variable to dict"""
@@ -250,7 +266,7 @@ class NodeVariable:
             "fill_value": self.fill_value,
             "series_output": [serie.toDict() for serie in self.series_output] if self.series_output is not None else None,
             "series_sim": [serie.toDict() for serie in self.series_sim] if self.series_sim is not None else None,
-            "time_support": isodate.duration_isoformat(self.time_support) if self.time_support is not None else None, 
+            "time_support": _duration_isoformat(self.time_support) if self.time_support is not None else None, 
             "adjust_from": self.adjust_from,
             "linear_combination": self.linear_combination,
             "interpolation_limit": self.interpolation_limit,
@@ -258,29 +274,23 @@ class NodeVariable:
             "original_data": self.originalDataAsDict(),
             "adjust_results": self.adjust_results,
             "name": self.name,
-            "time_interval": isodate.duration_isoformat(self.time_interval) if self.time_interval is not None else None
+            "time_interval": _duration_isoformat(self.time_interval) if self.time_interval is not None else None
         }
     def toJSON(self) -> str:
         """Convert this variable to JSON string"""
-        return json.dumps(self.toDict())
+        return orjson.dumps(self.toDict(), option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
     
     def dataAsDict(self) -> List[dict]:
         """Convert this variable's data to a list of records (dict)"""
         if self.data is None:
             return None
-        data = self.data.reset_index().to_dict("records") 
-        for row in data:
-            row["timestart"] = row["timestart"].isoformat() if "timestart" in row else None
-        return data
+        return _dataFrameToRecords(self.data)
     
     def originalDataAsDict(self) -> List[dict]:
         """Convert this variable's original data to a list of records (dict)"""
         if self.original_data is None:
             return None
-        data = self.original_data.reset_index().to_dict("records") 
-        for row in data:
-            row["timestart"] = row["timestart"].isoformat() if "timestart" in row else None
-        return data
+        return _dataFrameToRecords(self.original_data)
     
     def getData(
         self,
@@ -300,7 +310,7 @@ class NodeVariable:
             return None
         data = self.data[["valor","tag"]] # self.concatenateProno(inline=False) if include_prono else self.data[["valor","tag"]] # self.series[0].data            
         if include_series_id:
-            data["series_id"] = self.series_output.series_id if type(self.series_output) == NodeSerie else self.series_output[0].series_id if type(self.series_output) == list else None
+            data = data.assign(series_id=self.series_output.series_id if type(self.series_output) == NodeSerie else self.series_output[0].series_id if type(self.series_output) == list else None)
         return data
     
     def toCSV(
@@ -334,14 +344,9 @@ class NodeVariable:
         --------
         merged data : DataFrame
         """
-        data = None
-        i = 0
-        for serie in self.series_output:
-            i = i + 1
-            series_data = serie.data[["valor","tag"]]
-            series_data["series_id"] = serie.series_id
-            data = series_data if i == 1 else pandas.concat([data,series_data],axis=0)
-        return data
+        if not len(self.series_output):
+            return None
+        return pandas.concat([serie.data[["valor","tag"]].assign(series_id=serie.series_id) for serie in self.series_output],axis=0)
     
     def outputToCSV(
         self,
@@ -414,11 +419,11 @@ class NodeVariable:
         """
         if use_node_id and self._node is None:
             raise Exception("Can't use_node_id: node is not set")
-        data = self.data[self.data.valor.notnull()].copy()
-        data.loc[:,"timestart"] = data.index
-        data.loc[:,"timeend"] = [x + self.time_support for x in data["timestart"]] if self.time_support is not None else data["timestart"]
-        data.loc[:,"timestart"] = [x.isoformat() for x in data["timestart"]]
-        data.loc[:,"timeend"] = [x.isoformat() for x in data["timeend"]]
+        data = self.data[self.data.valor.notnull()]
+        timestart = isoformatDatetimeIndex(data.index)
+        data = data.assign(
+            timestart = timestart,
+            timeend = isoformatDatetimeIndex(data.index + self.time_support) if self.time_support is not None else timestart)
         if len(data) and include_series_id:
             data.loc[:,"series_id"] = self.node_id if use_node_id else self.series_output[0].series_id if self.series_output is not None else None
         return data.to_dict(orient="records")
@@ -505,19 +510,15 @@ class NodeVariable:
         sim = sim if sim is not None else self.adjust_from["sim"]
         truth_data = self.series[truth].data
         sim_data = self.series[sim].data
-        self.series[sim].original_data = sim_data.copy(deep=True)
+        self.series[sim].original_data = _snapshot(sim_data)
         try:
             adj_serie, tags, model = adjustSeries(sim_data,truth_data,method=self.adjust_from["method"],plot=plot,tag_column="tag",title=self.name)
         except ValueError:
             logging.debug("No observations found to estimate coefficients. Skipping adjust")
             return
         # self.series[self.adjust_from["sim"]].data["valor"] = adj_serie
-        self.data.loc[:,"valor"] = adj_serie
-        self.data.loc[:,"tag"] = tags
         self.adjust_results = model
-        if error_band:
-            self.data.loc[:,"error_band_01"] = adj_serie + self.adjust_results["quant_Err"][0.001]
-            self.data.loc[:,"error_band_99"] = adj_serie + self.adjust_results["quant_Err"][0.999]     
+        self.data = self._assignAdjusted(self.data, adj_serie, tags, model, error_band)
     
     def apply_linear_combination(
         self,
@@ -539,7 +540,7 @@ class NodeVariable:
             Linear combination parameters: "intercept" and "coefficients". If None, reads from self.linear_combination
         """
 
-        self.series[series_index].original_data = self.series[series_index].data.copy(deep=True)
+        self.series[series_index].original_data = _snapshot(self.series[series_index].data)
         #self.series[series_index].data.loc[:,"valor"] = util.linearCombination(self.pivotData(),self.linear_combination,plot=plot)
         self.data.loc[:,"valor"],  self.data.loc[:,"tag"] = linearCombination(self.pivotData(),linear_combination if linear_combination is not None else self.linear_combination,plot=plot,tag_column="tag")
     
@@ -572,27 +573,46 @@ class NodeVariable:
                 logging.debug("No observations found to estimate coefficients. Skipping adjust")
                 return
             # self.series[self.adjust_from["sim"]].data["valor"] = adj_serie
-            serie_prono.data.loc[:,"valor"] = adj_serie
-            serie_prono.data.loc[:,"tag"] = tags
             serie_prono.adjust_results = model
-            if error_band:
-                serie_prono.data.loc[:,"error_band_01"] = adj_serie + serie_prono.adjust_results["quant_Err"][0.001]
-                serie_prono.data.loc[:,"error_band_99"] = adj_serie + serie_prono.adjust_results["quant_Err"][0.999]     
+            serie_prono.data = self._assignAdjusted(serie_prono.data, adj_serie, tags, model, error_band)
+    
+    @staticmethod
+    def _assignAdjusted(
+        data : pandas.DataFrame,
+        adj_serie : pandas.Series,
+        tags : pandas.Series,
+        model : dict,
+        error_band : bool = True
+        ) -> pandas.DataFrame:
+        """Returns a copy of data with valor and tag (and optionally error_band_01, error_band_99) set from the results of adjustSeries. adj_serie and tags are aligned to data.index once, then assigned as arrays"""
+        valor = adj_serie.reindex(data.index).to_numpy()
+        columns = {
+            "valor": valor,
+            "tag": tags.reindex(data.index).to_numpy() if tags is not None else None
+        }
+        if error_band:
+            columns["error_band_01"] = valor + model["quant_Err"][0.001]
+            columns["error_band_99"] = valor + model["quant_Err"][0.999]
+        return data.assign(**columns)
     
     def setOutputData(self) -> None:
         """Copies .data into each series_output .data, and applies offset where .x_offset and/or y_offset are set"""
         if self.series_output is not None and self.data is not None:
-            for serie in self.series_output:
-                serie.data = self.data[["valor","tag"]]
+            # select the columns once. applyOffset writes into each serie's frame, so every other serie gets its own snapshot (shallow under Copy-on-Write)
+            data = self.data[["valor","tag"]]
+            frames = [data] + [_snapshot(data) for _ in self.series_output[1:]]
+            for serie, frame in zip(self.series_output, frames):
+                serie.data = frame
                 serie.applyOffset()
     
     def uploadData(
         self,
         include_prono : bool = False,
         api_config : dict = None,
+        workers : int = 1
         ) -> list:
         """
-        Uploads series_output (analysis results) to output API. For each serie in series_output, it converts .data into a list of records, uploads the records using .series_id as the series identifier, then concatenates all responses into a single list which it returns
+        Uploads series_output (analysis results) to output API. For each serie in series_output, it converts .data into a list of records, uploads the records using .series_id as the series identifier, then concatenates all responses into a single list which it returns. Records of all series are built first, then posted (concurrently through a thread pool if workers > 1)
 
         Parameters:
         -----------
@@ -606,6 +626,9 @@ class NodeVariable:
             - url : str
             - token : str
             - proxy_dict : dict
+        
+        workers : int = 1
+            Maximum number of concurrent requests. If 1 (default), series are posted serially
 
         Returns:
         --------
@@ -615,17 +638,28 @@ class NodeVariable:
         if self.series_output is not None:
             if self.series_output[0].data is None:
                 self.setOutputData()
-            obs_created = []
+            obs_lists = []
             for serie in self.series_output:
                 obs_list = serie.toList(remove_nulls=True,max_obs_date=None if include_prono else self.max_obs_date if hasattr(self,"max_obs_date") else None) # include_series_id=True)
                 if serie.save_post is not None:
                     json.dump(obs_list,open("%s/%s" % (os.environ["PYDRODELTA_DIR"], serie.save_post),"w"))
                     logging.info("Wrote output of node %s, variable %i, serie %i to %s" % (self.node_id,self.id, serie.series_id, serie.save_post))
+                obs_lists.append((serie.series_id, obs_list))
+            def post(series_id : int, obs_list : list) -> list:
                 try:
-                    created = api_client.createObservaciones(obs_list,series_id=serie.series_id)
-                    obs_created.extend(created)
+                    return api_client.createObservaciones(obs_list,series_id=series_id)
                 except Exception as e:
                     logging.error(str(e))
+                    return []
+            obs_created = []
+            if workers is None or workers <= 1 or len(obs_lists) <= 1:
+                for series_id, obs_list in obs_lists:
+                    obs_created.extend(post(series_id, obs_list))
+                return obs_created
+            with ThreadPoolExecutor(max_workers=min(workers,len(obs_lists))) as executor:
+                futures = [executor.submit(post, series_id, obs_list) for series_id, obs_list in obs_lists]
+                for future in futures:
+                    obs_created.extend(future.result())
             return obs_created
         else:
             logging.info("Missing output series for node %i, variable %i, skipping upload" % (self.node_id, self.id))
@@ -645,13 +679,17 @@ class NodeVariable:
         Returns:
         --------
         pivoted data : DataFrame"""
-        data = self.series[0].data[["valor",]]
-        for serie in self.series:
-            if len(serie.data):
-                data = data.join(serie.data[["valor",]],how='outer',rsuffix="_%s" % serie.series_id,sort=True)
+        frames = [serie.data[["valor",]].rename(columns={"valor": "valor_%s" % serie.series_id}) for serie in self.series if len(serie.data)]
         if include_prono and self.series_prono is not None and len(self.series_prono):
-            for serie in self.series_prono:
-                data = data.join(serie.data[["valor",]],how='outer',rsuffix="_prono_%s" % serie.series_id,sort=True)
+            frames.extend([serie.data[["valor",]].rename(columns={"valor": "valor_prono_%s" % serie.series_id}) for serie in self.series_prono])
+        if not len(frames):
+            return self.series[0].data[[]]
+        if all(frame.index.is_unique for frame in frames):
+            return pandas.concat(frames,axis=1,join="outer",sort=True,copy=False)
+        # concat can't align duplicate timestamps: join one serie at a time, starting from the first serie as before
+        data = self.series[0].data[["valor",]]
+        for frame in frames:
+            data = data.join(frame,how='outer',sort=True)
         del data["valor"]
         return data
     
@@ -670,10 +708,15 @@ class NodeVariable:
         --------
         pivoted data : DataFrame"""
         columns = ["valor","tag"] if include_tag else ["valor"]
+        frames = [serie.data[columns].rename(columns={column: "%s_%s" % (column, serie.series_id) for column in columns}) for serie in self.series_output if len(serie.data)]
+        if not len(frames):
+            return self.series_output[0].data[[]]
+        if all(frame.index.is_unique for frame in frames):
+            return pandas.concat(frames,axis=1,join="outer",sort=True,copy=False)
+        # concat can't align duplicate timestamps: join one serie at a time, starting from the first serie as before
         data = self.series_output[0].data[columns]
-        for serie in self.series_output:
-            if len(serie.data):
-                data = data.join(serie.data[columns],how='outer',rsuffix="_%s" % serie.series_id,sort=True)
+        for frame in frames:
+            data = data.join(frame,how='outer',sort=True)
         for column in columns:
             del data[column]
         return data
@@ -699,17 +742,8 @@ class NodeVariable:
         if pivot:
             data = self.pivotData(include_prono)
         else:
-            data = self.series[0].data[["valor",]]
-            data["series_id"] = self.series[0].series_id
-            data["timestart"] = data.index
-            data.reset_index()
-            for i in range(1,len(self.series)-1):
-                if len(self.series[i].data):
-                    other_data = self.series[i].data[["valor",]]
-                    other_data["series_id"] = self.series[i].series_id
-                    other_data["timestart"] = other_data.index
-                    other_data.reset_index
-                    data = data.append(other_data,ignore_index=True)
+            series = [serie for serie in self.series if len(serie.data)] or self.series[:1]
+            data = pandas.concat([serie.data[["valor",]].assign(series_id=serie.series_id, timestart=serie.data.index) for serie in series],ignore_index=True)
         return data
     
     def saveSeries(
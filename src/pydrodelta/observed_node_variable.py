@@ -8,6 +8,7 @@ import numpy as np
 from typing import List, Union
 from datetime import datetime
 from pandas import DataFrame
+from concurrent.futures import ThreadPoolExecutor
 
 class ObservedNodeVariable(NodeVariable):
     """This class represents a variable observed at a node"""
@@ -63,7 +64,9 @@ class ObservedNodeVariable(NodeVariable):
         timeend : datetime,
         include_prono : bool = True,
         forecast_timeend : datetime = None,
-        input_api_config : dict = None
+        input_api_config : dict = None,
+        workers : int = 1,
+        keep_original : bool = False
         ) -> None:
         """
         Load data of each serie in .series from source
@@ -89,35 +92,51 @@ class ObservedNodeVariable(NodeVariable):
             - url : str
             - token : str
             - proxy_dict : dict
+        
+        workers : int = 1
+            Number of threads used to load series concurrently (retrieval is network-bound, so requests to the input api overlap)
+        
+        keep_original : bool = False
+            Save a copy of the loaded data of each serie into its .original_data. Before, series always kept this copy; it is now made only on request
         """
         logging.debug("Load data for observed node: %i" % (self.id))
         if self.series is not None:
-            for serie in self.series:
-                serie.loadData(timestart,timeend,input_api_config)
+            self._forEachSerie(self.series, lambda serie: serie.loadData(timestart,timeend,input_api_config,keep_original), workers)
         elif hasattr(self,"derived_from") and self.derived_from is not None:
             self.series = []
         else:
             self.series = []
         if include_prono and self.series_prono is not None and len(self.series_prono):
             forecast_timeend = forecast_timeend if forecast_timeend is not None else self.forecast_timeend
-            for serie in self.series_prono:
-                if forecast_timeend is not None:
-                    try:
-                        serie.loadData(timestart,forecast_timeend,input_api_config)
-                    except Exception as e:
+            def loadPronoData(serie : NodeSerieProno) -> None:
+                try:
+                    serie.loadData(timestart,forecast_timeend if forecast_timeend is not None else timeend,input_api_config,keep_original)
+                except Exception as e:
+                    if forecast_timeend is not None:
                         logging.error(e)
-                        raise Exception("Node %s, Variable: %i, series_id %i, cal_id %i: failed loadData: %s" % (self.node_id,self.id,serie.series_id,serie.cal_id,str(e)))
-                else:
-                    try:
-                        serie.loadData(timestart,timeend,input_api_config)
-                    except Exception as e:
-                        raise Exception("Node %s, Variable: %i, series_id %i, cal_id %i: failed loadData: %s" % (str(self.node_id),self.id,serie.series_id,serie.cal_id,str(e)))
+                    raise Exception("Node %s, Variable: %i, series_id %i, cal_id %i: failed loadData: %s" % (str(self.node_id),self.id,serie.series_id,serie.cal_id,str(e)))
+            self._forEachSerie(self.series_prono, loadPronoData, workers)
         if self.data is None and self.series is not None and len(self.series):
             self.setDataWithNoValues()
             self.concatenate(self.series[0].data)
         else:
             self.setDataWithNoValues()
     
+    def _forEachSerie(
+        self,
+        series : List[NodeSerie],
+        fn,
+        workers : int = 1
+        ) -> None:
+        """Call fn(serie) on each of series. If workers > 1, series are processed concurrently in a thread pool"""
+        if workers is None or workers <= 1 or len(series) <= 1:
+            for serie in series:
+                fn(serie)
+            return
+        with ThreadPoolExecutor(max_workers=min(workers, len(series))) as executor:
+            # consume the results so that exceptions are raised
+            list(executor.map(fn, series))
+    
     def setDataWithNoValues(self) -> None:
         """Sets .data with null values and tags"""
         if self.time_interval is None:
@@ -3,13 +3,14 @@ import logging
 import json
 import pydrodelta.util as util
 from pydrodelta.a5 import createEmptyObsDataFrame
-from pydrodelta.result_statistics import ResultStatistics
+from pydrodelta.result_statistics import ResultStatistics, computeMetric
 from pydrodelta.procedure_function_results import ProcedureFunctionResults
 from pydrodelta.pydrology import testPlot
 from pydrodelta.calibration import Calibration
 from typing import Optional, Union, List, Tuple
 from datetime import timedelta
 from pandas import DataFrame
+from numpy import ndarray, asarray, empty, dtype as np_dtype
 
 class Procedure():
     """
@@ -52,6 +53,10 @@ class Procedure():
         Configuration for Downhill Simplex calibration procedure (see Calibration)
 
     """
+
+    batch_run : bool = False
+    """True if .runBatch evaluates several parameter sets at once. The base .runBatch just loops over .run, so Calibration.makeSimplex scores the initial simplex point by point through Calibration.runReturnScore instead"""
+
     def __init__(
         self,
         id : Union[int, str],
@@ -115,6 +120,8 @@ class Procedure():
         """Pivot DataFrame of procedure states. Byproduct of .run(inplace=True) execution"""
         self.procedure_function_results : ProcedureFunctionResults = None
         """Results of the procedure function execution"""
+        self._statistics_cache : tuple = None
+        """Observed output frames and output metadata precomputed by .prepareStatisticsCache, reused by .computeStatistics while .output_obs is unchanged"""
         self.save_results : str = save_results
         """Save procedure results into this file (csv pivoted table)"""
         self.overwrite : bool = bool(overwrite)
@@ -234,6 +241,49 @@ class Procedure():
             self.output_obs = data
         else:
             return data
+    def prepareStatisticsCache(self) -> None:
+        """Precompute the observed output frames (renamed for the obs/sim join) and output metadata used by .computeStatistics. They are reused for every run until .output_obs is replaced (i.e., while calibrating). .output_obs must be already loaded"""
+        if self.output_obs is None:
+            self._statistics_cache = None
+            return
+        self._statistics_cache = (
+            self.output_obs,
+            [o[["valor"]].rename(columns={"valor":"obs"}) for o in self.output_obs],
+            [o.toDict() for o in self.function.outputs]
+        )
+    def computeScore(
+        self,
+        objective_function : str = "rmse",
+        result_index : int = 0
+        ) -> Optional[float]:
+        """Compute a single statistic of .output vs .output_obs for one output, restricted to the calibration period if set. Same value as the corresponding attribute of .computeStatistics results, without computing the others
+        
+        Parameters:
+        ----------
+
+        objective_function : str
+            Statistic name. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr'
+        
+        result_index : int
+            Index of the output
+
+        Returns
+        -------
+        float or None if statistics are disabled for the output or there are no obs/sim pairs
+        """
+        if not self.function.outputs[result_index].compute_statistics:
+            return None
+        if self._statistics_cache is not None and self._statistics_cache[0] is self.output_obs:
+            obs_frame = self._statistics_cache[1][result_index]
+        else:
+            obs_frame = self.output_obs[result_index][["valor"]].rename(columns={"valor":"obs"})
+        inner_join = self.output[result_index][["valor"]].rename(columns={"valor":"sim"}).join(obs_frame,how="inner").dropna()
+        calibration_period = self.getCalibrationPeriod()
+        if calibration_period is not None:
+            inner_join = inner_join[(inner_join.index >= calibration_period[0]) & (inner_join.index <= calibration_period[1])]
+            if not len(inner_join):
+                raise Exception("Invalid calibration period: no data found")
+        return computeMetric(inner_join["obs"].values, inner_join["sim"].values, objective_function)
     def computeStatistics(
         self, 
         obs : Optional[list] = None, 
@@ -261,6 +311,10 @@ class Procedure():
         """
         obs = obs if obs is not None else self.output_obs
         sim = sim if sim is not None else self.output
+        if self._statistics_cache is not None and self._statistics_cache[0] is obs:
+            obs_frames, metadata = self._statistics_cache[1], self._statistics_cache[2]
+        else:
+            obs_frames, metadata = None, None
         result = list()
         result_val = list()
         # if len(obs) < len(sim):
@@ -270,7 +324,9 @@ class Procedure():
                 raise Exception("List of sim outputs is shorter than function.outputs (%i < %i" % (len(sim), len(self.function.outputs)))
             if len(obs) < i + 1:
                 raise Exception("List of obs outputs is smaller than function.outputs (%i < %i" % (len(obs), len(self.function.outputs)))
-            inner_join = sim[i][["valor"]].rename(columns={"valor":"sim"}).join(obs[i][["valor"]].rename(columns={"valor":"obs"}),how="inner").dropna()
+            obs_frame = obs_frames[i] if obs_frames is not None else obs[i][["valor"]].rename(columns={"valor":"obs"})
+            o_metadata = metadata[i] if metadata is not None else o.toDict()
+            inner_join = sim[i][["valor"]].rename(columns={"valor":"sim"}).join(obs_frame,how="inner").dropna()
             if calibration_period is not None:
                 grouped_by_date = inner_join.groupby((inner_join.index >= calibration_period[0]) & (inner_join.index <= calibration_period[1]))
                 inner_join_val = None
@@ -286,7 +342,7 @@ class Procedure():
                     obs = inner_join_cal["obs"].values if inner_join_cal is not None else [], 
                     sim = inner_join_cal["sim"].values if inner_join_cal is not None else [], 
                     compute = o.compute_statistics, 
-                    metadata = o.toDict(),
+                    metadata = o_metadata,
                     calibration_period = calibration_period,
                     group = "cal"
                 ))
@@ -295,7 +351,7 @@ class Procedure():
                         obs = inner_join_val["obs"].values, 
                         sim = inner_join_val["sim"].values, 
                         compute = o.compute_statistics, 
-                        metadata = o.toDict(),
+                        metadata = o_metadata,
                         calibration_period = calibration_period,
                         group = "val"
                     ))
@@ -306,7 +362,7 @@ class Procedure():
                     obs = inner_join["obs"].values, 
                     sim = inner_join["sim"].values, 
                     compute = o.compute_statistics, 
-                    metadata = o.toDict()
+                    metadata = o_metadata
                 ))
         if self.procedure_function_results is not None:
             self.procedure_function_results.setStatistics(result)
@@ -355,7 +411,9 @@ class Procedure():
         parameters : Union[list,tuple] = None, 
         initial_states : Union[list,tuple] = None, 
         load_input : bool = True, 
-        load_output_obs : bool = True
+        load_output_obs : bool = True,
+        compute_statistics : bool = True,
+        dtype : Optional[Union[str,np_dtype]] = None
         ) -> Union[List[DataFrame], None]:
         """
         Run self.function.run()
@@ -375,6 +433,10 @@ class Procedure():
             If True, load input using .loadInput. Else, reads from .input
         load_output_obs : bool
             If True, load observed output using .loadOutputObs. Else, reads from .output_obs
+        compute_statistics : bool
+            If False, skip .computeStatistics (e.g., when the caller computes a single score with .computeScore)
+        dtype : str, numpy dtype or None
+            If set, pass parameters to the procedure function as an array of this floating point type (e.g. 'float32'). Statistics are computed in float64 regardless
         
         Returns
         -------
@@ -396,6 +458,8 @@ class Procedure():
         else:
             # logging.debug("Output obs already loaded")
             output_obs = self.output_obs
+        if dtype is not None and parameters is not None:
+            parameters = asarray(parameters, dtype=dtype)
         # runs procedure function
         output, procedure_function_results = self.function.rerun(input = input, parameters = parameters, initial_states = initial_states)
         # sets procedure_function_results
@@ -406,10 +470,11 @@ class Procedure():
         # compute statistics
         if inplace:
             self.output = output
-            self.computeStatistics(
-                calibration_period=self.getCalibrationPeriod(),
-                result_index=self.getResultIndex())
-        else:
+            if compute_statistics:
+                self.computeStatistics(
+                    calibration_period=self.getCalibrationPeriod(),
+                    result_index=self.getResultIndex())
+        elif compute_statistics:
             self.computeStatistics(
                 obs=output_obs,
                 sim=output,
@@ -423,6 +488,45 @@ class Procedure():
             return
         else:
             return output
+    def runBatch(
+        self,
+        parameters_batch : Union[list, ndarray],
+        objective_function : str = "rmse",
+        result_index : int = 0,
+        dtype : Optional[Union[str,np_dtype]] = None
+        ) -> ndarray:
+        """
+        Run the procedure for each parameter set of parameters_batch and return the objective function values. Input and observed output must be already loaded (.loadInput, .loadOutputObs). Procedures able to evaluate several parameter sets at once may override this method and set .batch_run = True
+
+        Parameters:
+        ----------
+
+        parameters_batch : list or ndarray
+            2D array-like of shape (number of parameter sets, number of parameters)
+        objective_function : str
+            Name of the objective function. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr'
+        result_index : int
+            Index of the output to use to compute the objective function
+        dtype : str, numpy dtype or None
+            Floating point type of the parameter sets passed to the procedure function. Defaults to float64
+        
+        Returns
+        -------
+        objective function values : ndarray of shape (number of parameter sets,)
+        """
+        parameters_batch = asarray(parameters_batch, dtype=dtype if dtype is not None else float)
+        scores = empty(len(parameters_batch), dtype=float)
+        for i, parameters in enumerate(parameters_batch):
+            self.run(
+                parameters=parameters, 
+                save_results="", 
+                load_input=False, 
+                load_output_obs=False,
+                compute_statistics=False
+            )
+            score = self.computeScore(objective_function, result_index)
+            scores[i] = score if score is not None else float("nan")
+        return scores
     def getOutputNodeData(
         self,
         node_id : int,
@@ -1,6 +1,7 @@
 from .procedure_boundary import ProcedureBoundary
 from .procedure_function_results import ProcedureFunctionResults
 from typing import Optional, Union, Tuple, List
+from numpy.random import Generator
 from .types.procedure_boundary_dict import ProcedureBoundaryDict
 from .descriptors.list_descriptor import ListDescriptor
 from .descriptors.dict_descriptor import DictDescriptor
@@ -252,7 +253,8 @@ class ProcedureFunction:
         self,
         sigma : float = 0.25,
         limit : bool = True,
-        ranges : Optional[list] = None
+        ranges : Optional[list] = None,
+        rng : Optional[Generator] = None
         ) -> list:
         """Generate Simplex from procedure function parameters. 
         
@@ -268,6 +270,9 @@ class ProcedureFunction:
             
         ranges : list or None
             Override parameter ranges with these values. Length must be equal to self._parameters and each element of the list must be a 2-tuple (range_min, range_max) 
+
+        rng : Generator or None
+            Random number generator (numpy.random.default_rng). If None, the global numpy.random state is used
         
         Returns:
         --------
@@ -286,7 +291,7 @@ class ProcedureFunction:
                 else:
                     range_min = None
                     range_max = None
-                point.append(p.makeRandom(sigma=sigma, limit=limit, range_min=range_min, range_max=range_max))
+                point.append(p.makeRandom(sigma=sigma, limit=limit, range_min=range_min, range_max=range_max, rng=rng))
             points.append(point)
         return points
 
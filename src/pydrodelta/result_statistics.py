@@ -1,6 +1,89 @@
 import logging
 from pandas import DataFrame
 import math
+from numpy import ndarray, asarray, isnan
+from typing import Optional
+
+def _bias(obs : ndarray, sim : ndarray) -> float:
+    return float((sim - obs).sum() / len(obs))
+
+def _mse(obs : ndarray, sim : ndarray) -> float:
+    errors = sim - obs
+    return float((errors * errors).sum() / len(obs))
+
+def _rmse(obs : ndarray, sim : ndarray) -> float:
+    return _mse(obs, sim) ** 0.5
+
+def _variance(values : ndarray) -> float:
+    anomaly = values - values.sum() / len(values)
+    return float((anomaly * anomaly).sum() / len(values))
+
+def _nse(obs : ndarray, sim : ndarray) -> Optional[float]:
+    stdev_obs = _variance(obs)
+    return 1 - _mse(obs, sim) / stdev_obs if stdev_obs != 0 else None
+
+def _stdev_dif(obs : ndarray, sim : ndarray) -> float:
+    return _variance(sim) - _variance(obs)
+
+def _cov(obs : ndarray, sim : ndarray) -> float:
+    n = len(obs)
+    return float(((obs - obs.sum() / n) * (sim - sim.sum() / n)).sum() / n)
+
+def _r(obs : ndarray, sim : ndarray) -> Optional[float]:
+    var_obs = _variance(obs) ** 0.5
+    var_sim = _variance(sim) ** 0.5
+    return _cov(obs, sim) / var_obs / var_sim if var_obs != 0 and var_sim != 0 else None
+
+def _oneminusr(obs : ndarray, sim : ndarray) -> Optional[float]:
+    r = _r(obs, sim)
+    return 1 - r if r is not None else None
+
+METRIC_KERNELS = {
+    "rmse": _rmse,
+    "mse": _mse,
+    "bias": _bias,
+    "stdev_dif": _stdev_dif,
+    "stdev_diff": _stdev_dif,
+    "r": _r,
+    "nse": _nse,
+    "cov": _cov,
+    "oneminusr": _oneminusr
+}
+"""Single-statistic kernels over NaN-free obs, sim float arrays, keyed by statistic name. Same definitions as ResultStatistics.compute"""
+
+def computeMetric(
+    obs : ndarray,
+    sim : ndarray,
+    name : str
+    ) -> Optional[float]:
+    """Compute a single statistic of obs vs sim, with the same definitions as ResultStatistics.compute, without computing the others. NaN pairs are dropped
+    
+    Parameters:
+    -----------
+    obs : array of floats
+        Observed values
+
+    sim : array of floats
+        Simulated values. Must be of the same length as obs
+
+    name : str
+        Statistic name. One of 'rmse', 'mse', 'bias', 'stdev_dif', 'r', 'nse', 'cov', 'oneminusr'
+    
+    Returns:
+    --------
+    float or None if there are no obs/sim pairs or the statistic is undefined (zero variance)
+    """
+    if name not in METRIC_KERNELS:
+        raise ValueError("Invalid statistic name: %s" % name)
+    obs = asarray(obs, dtype=float)
+    sim = asarray(sim, dtype=float)
+    valid = ~(isnan(obs) | isnan(sim))
+    if not valid.all():
+        obs = obs[valid]
+        sim = sim[valid]
+    if not len(obs):
+        return None
+    return METRIC_KERNELS[name](obs, sim)
 
 class ResultStatistics:
     """Collection of statistic analysis results for the procedure"""
@@ -272,7 +272,8 @@ class Topology():
     def loadData(
         self,
         include_prono : bool = True,
-        input_api_config : dict = None) -> None:
+        input_api_config : dict = None,
+        keep_original : bool = False) -> None:
         """For each series of each variable of each node, load data from the source.
         
         Parameters:
@@ -287,7 +288,10 @@ class Topology():
             Properties:
             - url : str
             - token : str
-            - proxy_dict : dict"""
+            - proxy_dict : dict
+        
+        keep_original : bool default False
+            Save a copy of the loaded data of each serie into its .original_data. Before, series always kept this copy; it is now made only on request"""
         for node in self.nodes:
             # logging.debug("loadData timestart: %s, timeend: %s, time_interval: %s" % (self.timestart.isoformat(), self.timeend.isoformat(), str(node.time_interval)))
             timestart = self.timestart - node.time_interval if node.time_interval is not None else self.timeend
@@ -299,7 +303,8 @@ class Topology():
                     timeend, 
                     forecast_timeend = forecast_timeend, 
                     include_prono = include_prono,
-                    input_api_config = input_api_config)
+                    input_api_config = input_api_config,
+                    keep_original = keep_original)
             # for serie in node.series:
             #     if isinstance(serie,NodeSerie):
             #         serie.loadData(self.timestart,self.timeend)
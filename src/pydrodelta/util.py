@@ -12,6 +12,7 @@ import matplotlib.dates as mdates
 from matplotlib.dates import DateFormatter
 import csv
 import os.path
+import warnings
 from typing import Union
 
 def interval2timedelta(interval : Union[dict,float,timedelta]):
@@ -86,6 +87,24 @@ def interval2epoch(interval):
             seconds = seconds + interval[k] * 86400 * 365
     return seconds
 
+def parseIsoDate(date_string : str) -> datetime:
+    """
+    Parse ISO-8601 datetime string. Uses the C-implemented datetime.fromisoformat and falls back to dateutil.parser.isoparse for forms it doesn't accept
+
+    Parameters:
+    -----------
+    date_string : str
+        ISO-8601 datetime string
+
+    Returns:
+    --------
+    datetime object
+    """
+    try:
+        return datetime.fromisoformat(date_string)
+    except ValueError:
+        return dateutil.parser.isoparse(date_string)
+
 def tryParseAndLocalizeDate(
         date_string : Union[str,float,datetime],
         timezone : str='America/Argentina/Buenos_Aires'
@@ -116,7 +135,7 @@ def tryParseAndLocalizeDate(
     """
     
     Returns: datetime.datetime
-    date = dateutil.parser.isoparse(date_string) if isinstance(date_string,str) else date_string
+    date = parseIsoDate(date_string) if isinstance(date_string,str) else date_string
     is_from_interval = False
     if isinstance(date,dict):
         date = datetime.now() + interval2timedelta(date)
@@ -134,6 +153,38 @@ def tryParseAndLocalizeDate(
         date = date.astimezone(pytz.timezone(timezone))
     return date # , is_from_interval
 
+def tryParseAndLocalizeDates(
+        dates : pandas.Series,
+        timezone : str='America/Argentina/Buenos_Aires'
+    ) -> pandas.DatetimeIndex:
+    """
+    Vectorized tryParseAndLocalizeDate for absolute dates (ISO-8601 strings or datetime.datetime). Naive dates are localized to timezone, aware dates are converted to it. Falls back to element-wise parsing when the dates can't be parsed in one pass (i.e., mixed utc offsets) or when a naive date doesn't exist in timezone (DST gap), so that it is localized the same way as tryParseAndLocalizeDate
+
+    Parameters:
+    -----------
+    dates : pandas.Series
+        Dates to parse
+
+    timezone : str
+        Time zone string identifier. Default: America/Argentina/Buenos_Aires
+    
+    Returns:
+    --------
+    pandas.DatetimeIndex
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            index = pandas.DatetimeIndex(pandas.to_datetime(dates, format="ISO8601"))
+    except (ValueError, TypeError):
+        return pandas.DatetimeIndex([tryParseAndLocalizeDate(x, timezone) for x in dates], name=getattr(dates, "name", None))
+    if index.tz is None:
+        try:
+            return index.tz_localize(timezone, ambiguous=False, nonexistent="raise")
+        except pytz.exceptions.NonExistentTimeError:
+            return pandas.DatetimeIndex([tryParseAndLocalizeDate(x, timezone) for x in dates], name=getattr(dates, "name", None))
+    return index.tz_convert(timezone)
+
 def roundDownDate(date : datetime,timeInterval : timedelta,timeOffset : timedelta=None) -> datetime:
     if timeInterval.microseconds == 0:
         date = date.replace(microsecond=0)
@@ -174,7 +225,29 @@ def createDatetimeSequence(
     timestart = roundDate(timestart,timeInterval,timeOffset,"up")
     timeend = timeend if timeend  is not None else datetime_index.max()
     timeend = roundDate(timeend,timeInterval,timeOffset,"down")
-    return pandas.date_range(start=timestart, end=timeend, freq=pandas.DateOffset(days=timeInterval.days, hours=timeInterval.seconds // 3600, minutes = (timeInterval.seconds // 60) % 60))
+    offset = pandas.DateOffset(days=timeInterval.days, hours=timeInterval.seconds // 3600, minutes = (timeInterval.seconds // 60) % 60)
+    # a fixed frequency generates the sequence in one vectorized pass. It equals stepping by the calendar offset as long as the utc offset doesn't change along the sequence (i.e., no DST transitions). Else, fall back to the (element-wise) calendar offset
+    try:
+        datetime_sequence = pandas.date_range(start=timestart, end=timeend, freq=pandas.Timedelta(days=timeInterval.days, hours=timeInterval.seconds // 3600, minutes = (timeInterval.seconds // 60) % 60))
+    except pytz.exceptions.InvalidTimeError:
+        return pandas.date_range(start=timestart, end=timeend, freq=offset)
+    if datetime_sequence.tz is not None and len(datetime_sequence):
+        utc_offsets = datetime_sequence.tz_localize(None) - datetime_sequence.tz_convert(None)
+        if (utc_offsets != utc_offsets[0]).any():
+            return pandas.date_range(start=timestart, end=timeend, freq=offset)
+    return datetime_sequence
+
+def isoformatDatetimeIndex(datetime_index : pandas.DatetimeIndex) -> np.ndarray:
+    """Vectorized equivalent of [x.isoformat() for x in datetime_index]. Returns an object array of ISO-8601 strings"""
+    if (datetime_index.microsecond != 0).any() or (datetime_index.nanosecond != 0).any():
+        return np.array([x.isoformat() for x in datetime_index], dtype=object)
+    local = datetime_index.strftime("%Y-%m-%dT%H:%M:%S").to_numpy(dtype=object)
+    if datetime_index.tz is None:
+        return local
+    offset_minutes = (datetime_index.tz_localize(None) - datetime_index.tz_convert("UTC").tz_localize(None)).total_seconds().to_numpy().astype(np.int64) // 60
+    offsets, inverse = np.unique(offset_minutes, return_inverse=True)
+    suffixes = np.array(["%s%02i:%02i" % ("-" if o < 0 else "+", abs(o) // 60, abs(o) % 60) for o in offsets], dtype=object)
+    return local + suffixes[inverse]
 
 def f1(row,column="valor",timedelta_threshold=None):
     if -row["diff_with_next"] > timedelta_threshold:
@@ -231,8 +304,10 @@ def serieRegular(
         min_obs_date, max_obs_date = (df_join[~pandas.isna(df_join[column])].index.min(),df_join[~pandas.isna(df_join[column])].index.max())
         df_join["interpolated"] = df_join[column].interpolate(method='time',limit=interpolation_limit,limit_direction='both',limit_area=None if extrapolate else 'inside')
         if tag_column is not None:
-            # print("columns: " + df_join.columns)
-            df_join[tag_column] = [x[tag_column] if pandas.isna(x["interpolated"]) else "extrapolated" if i < min_obs_date or i > max_obs_date else "interpolated" if pandas.isna(x[column]) else x[tag_column] for (i, x) in df_join.iterrows()]
+            # tag filled values with vectorized masks instead of iterating over the rows
+            filled = df_join["interpolated"].notna().to_numpy() & df_join[column].isna().to_numpy()
+            extrapolated = filled & ((df_join.index < min_obs_date) | (df_join.index > max_obs_date))
+            df_join[tag_column] = df_join[tag_column].mask(filled, "interpolated").mask(extrapolated, "extrapolated")
         df_join[column] = df_join["interpolated"]
         del df_join["interpolated"]
         df_regular = df_regular.join(df_join, how = 'left')
@@ -244,11 +319,12 @@ def serieRegular(
         df_join = df_join.set_index("timestart")
         df_join["interpolated_backward"] = df_join[column].interpolate(method='time',limit=1,limit_direction='backward',limit_area=None)
         df_join["interpolated_forward"] = df_join[column].interpolate(method='time',limit=1,limit_direction='forward',limit_area=None)
-        df_join["interpolated_backward_filtered"] = df_join.apply(lambda row: f1(row,column,timedelta_threshold),axis=1) #[ x[column] if -x["diff_with_next"] > timedelta_threshold else x.interpolated_backward for (i,x) in df_join.iterrows()]
-        df_join["interpolated_forward_filtered"] = df_join.apply(lambda row: f2(row,column,timedelta_threshold),axis=1)#[ x[column] if x["diff_with_previous"] > timedelta_threshold else x.interpolated_forward for (i,x) in df_join.iterrows()]
-        df_join["interpolated_final"] = df_join.apply(lambda row: f3(row,column,timedelta_threshold),axis=1) #[x.interpolated_backward_filtered if pandas.isna(x.interpolated_forward_filtered) else x.interpolated_forward_filtered for (i,x) in df_join.iterrows()]
+        # same results as row-wise f1, f2, f3 and f4, computed with vectorized masks
+        df_join["interpolated_backward_filtered"] = df_join[column].where(-df_join["diff_with_next"] > timedelta_threshold, df_join["interpolated_backward"])
+        df_join["interpolated_forward_filtered"] = df_join[column].where(df_join["diff_with_previous"] > timedelta_threshold, df_join["interpolated_forward"])
+        df_join["interpolated_final"] = df_join["interpolated_forward_filtered"].fillna(df_join["interpolated_backward_filtered"])
         if tag_column is not None:
-            df_join["new_tag"] = df_join.apply(lambda row: f4(row,column,tag_column),axis=1) #[x[tag_column] if pandas.isna(x.interpolated_final) else "interpolated" if pandas.isna(x.valor) else x[tag_column] for (i,x) in df_join.iterrows()]
+            df_join["new_tag"] = df_join[tag_column].mask(df_join["interpolated_final"].notna() & df_join[column].isna(), "interpolated")
             df_regular = df_regular.join(df_join[["interpolated_final","new_tag"]].rename(columns={"interpolated_final":column,"new_tag":tag_column}), how = 'left')
         else:
             df_regular = df_regular.join(df_join[["interpolated_final",]].rename(columns={"interpolated_final":column}), how = 'left')
@@ -265,12 +341,16 @@ def f5(row,column="valor",tag_column="tag",min_obs_date=None,max_obs_date=None):
         return row[tag_column]
 
 def interpolateData(data,column="valor",tag_column=None,interpolation_limit=1,extrapolate=False):
-    min_obs_date, max_obs_date = (data[~pandas.isna(data[column])].index.min(),data[~pandas.isna(data[column])].index.max())
-    data["interpolated"] = data[column].interpolate(method='time',limit=interpolation_limit,limit_direction='both',limit_area=None if extrapolate else 'inside')
+    missing = data[column].isna()
+    obs_index = data.index[~missing.to_numpy()]
+    min_obs_date, max_obs_date = (obs_index.min(), obs_index.max())
+    interpolated = data[column].interpolate(method='time',limit=interpolation_limit,limit_direction='both',limit_area=None if extrapolate else 'inside')
     if tag_column is not None:
-        data[tag_column] = data.apply(lambda row: f5(row,column,tag_column,min_obs_date,max_obs_date),axis=1)#[x[tag_column] if pandas.isna(x["interpolated"]) else "extrapolated" if i < min_obs_date or i > max_obs_date else "interpolated" if pandas.isna(x[column]) else x[tag_column] for (i, x) in data.iterrows()]
-    data[column] = data["interpolated"]
-    del data["interpolated"]
+        # same tags as f5, computed with vectorized masks instead of a row-wise apply
+        filled = interpolated.notna().to_numpy() & missing.to_numpy()
+        extrapolated = filled & ((data.index < min_obs_date) | (data.index > max_obs_date))
+        data[tag_column] = data[tag_column].mask(filled, "interpolated").mask(extrapolated, "extrapolated")
+    data[column] = interpolated
     return data
 
 def serieFillNulls(data : pandas.DataFrame, other_data : pandas.DataFrame, column : str="valor", other_column : str="valor", fill_value : float=None, shift_by : int=0, bias : float=0, extend=False, tag_column=None):
@@ -280,6 +360,22 @@ def serieFillNulls(data : pandas.DataFrame, other_data : pandas.DataFrame, colum
     si extend=True el índice del dataframe resultante será la unión de los índices de data y other_data (caso contrario será igual al índice de data)
     """
     # logging.debug("before. data.index.name: %s. other_data.index.name: %s" % (data.index.name, other_data.index.name))
+    if shift_by == 0 and data.index.is_unique and other_data.index.is_unique and pandas.api.types.is_float_dtype(data[column]) and pandas.api.types.is_float_dtype(other_data[other_column]):
+        # no shift: align both frames once and fill with numpy masks instead of joining
+        if extend:
+            data = data.reindex(data.index.union(other_data.index))
+        other_data = other_data.reindex(data.index)
+        valor = data[column].to_numpy()
+        columns = {column: np.where(np.isnan(valor), other_data[other_column].to_numpy() + bias, valor)}
+        if tag_column is not None:
+            tag = data[tag_column].to_numpy(dtype=object)
+            columns[tag_column] = np.where(pandas.isna(tag), other_data[tag_column].to_numpy(dtype=object), tag)
+        data = data.assign(**columns)
+        if fill_value is not None:
+            data[column] = data[column].fillna(fill_value)
+            if tag_column is not None:
+                data[tag_column] = data[tag_column].fillna("filled")
+        return data
     mapper = {}
     mapper[other_column] = "valor_fillnulls"
     how = "outer" if extend else "left"
@@ -310,7 +406,7 @@ def serieMovingAverage(
     ) -> pandas.DataFrame:
     data = pandas.DataFrame(obs_df[column].rolling(offset, min_periods=1).mean())
     if tag_column is not None:
-        data.insert(1,'tag', [x if not pandas.isna(x) else "moving_average" for x in obs_df[tag_column]], True)
+        data.insert(1,'tag', obs_df[tag_column].fillna("moving_average").to_numpy(), True)
     return data
 
 def applyTimeOffsetToIndex(obs_df,x_offset):
@@ -333,11 +429,11 @@ def removeOutliers(data : pandas.DataFrame,limite_outliers,column="valor"):
     # print("Limite superior",round(limit_sup,2))
     # print("Limite inferior",round(limit_inf,2)) 
     # Finding the Outliers
-    outliers_iqr = data[( data[column] < limit_inf) | (data[column] > limit_sup)]
+    values = data[column].to_numpy(dtype=float)
+    mask = outliersMask(values,limit_inf,limit_sup)
+    outliers_iqr = data[mask]
     logging.debug('Cantidad de outliers: %i' % len(outliers_iqr))
-    data[column] = np.where(data[column]>limit_sup,np.nan,
-                   np.where(data[column]<limit_inf,np.nan,
-                   data[column]))
+    data[column] = np.where(mask,np.nan,values)
     return outliers_iqr
 
 def detectJumps(data : pandas.DataFrame,lim_jump,column="valor"):
@@ -345,17 +441,28 @@ def detectJumps(data : pandas.DataFrame,lim_jump,column="valor"):
     returns jump rows as data frame
     '''
     # print('Detecta Saltos:')	
-    data_ = data[[column,]].copy()
-    VecDif = abs(np.diff(data_[column].values))
-    VecDif = np.append([0,],VecDif)
+    VecDif = jumpsDiff(data[column].to_numpy(dtype=float))
+    mask = VecDif > lim_jump
     coldiff = 'Diff_Valor'
-    data_[coldiff] = VecDif
     # print('Limite Salto (m): ',lim_jump)
-    df_saltos = data_[data_[coldiff] > lim_jump].sort_values(by=coldiff)
+    df_saltos = data.loc[mask,[column]].assign(**{coldiff: VecDif[mask]}).sort_values(by=coldiff)
     logging.debug('Cantidad de Saltos: %i' % len(df_saltos))
-    del data_[coldiff]
     return df_saltos
 
+def outliersMask(values : np.ndarray, limit_inf : float, limit_sup : float) -> np.ndarray:
+    '''
+    boolean mask of values out of [limit_inf, limit_sup]. NaN values are not flagged
+    '''
+    return (values < limit_inf) | (values > limit_sup)
+
+def jumpsDiff(values : np.ndarray) -> np.ndarray:
+    '''
+    absolute difference of each value with the previous one (0 for the first value)
+    '''
+    diff = np.zeros(len(values))
+    diff[1:] = np.abs(np.diff(values))
+    return diff
+
 def adjustSeries(sim_df,truth_df,method="lfit",plot=True,return_adjusted_series=True,tag_column=None,title=None)  -> pandas.Series:
     if method == "lfit":
         data = truth_df.join(sim_df,how="left",rsuffix="_sim")
@@ -631,41 +738,48 @@ def readCsvFile(csv_file):
         return [row for row in csv.DictReader(csvfile)]
 
 def parseObservations(observations:list) -> list:
-    result = []
+    timestarts = []
+    valores = []
     for i, o in enumerate(observations):
         # option 1: dict { "timestart": str, "valor": number }
         if type(o) == dict:
             if "timestart" not in o:
                 raise Exception("timestart missing from observations item %i" % i)
-            result.append({
-                "timestart": tryParseAndLocalizeDate(o["timestart"]),
-                "valor": float(o["valor"]) if "valor" in o and o["valor"] is not None else None
-            })
+            timestarts.append(o["timestart"])
+            valores.append(o["valor"] if "valor" in o else None)
         # option 2: list
         elif type(o) == list or type(o) == tuple:
             if len(o) == 0:
                 continue
-            result.append({
-                "timestart": tryParseAndLocalizeDate(o[0]),
-                "valor": float(o[1]) if len(o) > 1 and o[1] is not None else None
-            })
-    return result
+            timestarts.append(o[0])
+            valores.append(o[1] if len(o) > 1 else None)
+    if not len(timestarts):
+        return []
+    # absolute dates are parsed in one vectorized pass. Relative dates (dict or number of days) are parsed element-wise
+    if all(isinstance(t,(str,datetime)) for t in timestarts):
+        timestarts = tryParseAndLocalizeDates(pandas.Series(timestarts))
+    else:
+        timestarts = [tryParseAndLocalizeDate(t) for t in timestarts]
+    return [{"timestart": t, "valor": float(v) if v is not None else None} for t, v in zip(timestarts, valores)]
 
 def readDataFromCsvFile(csv_file: str,series_id: int,timestart=None,timeend=None) -> list:
     """reads from csv_file and returns list of observaciones (dicts). series_id must be in the header of the column containing the values of the corresponding series. timestart column must be in iso format. Other columns are ignored"""
-    observaciones = readCsvFile(csv_file)
-    data = []
-    for o in observaciones:
-        parsed_timestart = tryParseAndLocalizeDate(o["timestart"])
-        if timestart is not None and parsed_timestart < timestart:
-            continue
-        if timeend is not None and parsed_timestart > timeend:
-            continue
-        if str(series_id) not in o:
-            raise Exception("column %s missing from csv file %s." % (series_id,csv_file))
-        parsed_valor = tryParseFloat(o[str(series_id)])
-        data.append({"series_id": series_id, "timestart": parsed_timestart, "valor": parsed_valor})
-    return data
+    if not os.path.exists(csv_file):
+        raise FileNotFoundError("csv file %s not found" % csv_file)
+    column = str(series_id)
+    observaciones = pandas.read_csv(csv_file, usecols=lambda c: c in ("timestart", column), dtype={"timestart": str, column: str}, keep_default_na=False)
+    parsed_timestart = tryParseAndLocalizeDates(observaciones["timestart"])
+    mask = np.ones(len(observaciones), dtype=bool)
+    if timestart is not None:
+        mask &= parsed_timestart >= timestart
+    if timeend is not None:
+        mask &= parsed_timestart <= timeend
+    if not mask.any():
+        return []
+    if column not in observaciones.columns:
+        raise Exception("column %s missing from csv file %s." % (series_id,csv_file))
+    parsed_valor = [tryParseFloat(v) for v in observaciones[column].to_numpy()[mask]]
+    return [{"series_id": series_id, "timestart": t, "valor": v} for t, v in zip(parsed_timestart[mask], parsed_valor)]
 
 def tryParseFloat(value,allow_none=True):
     if type(value) == str:
@@ -1,4 +1,5 @@
-from pydrodelta.a5 import Observacion, Serie, Crud, observacionesListToDataFrame, observacionesDataFrameToList, createEmptyObsDataFrame
+from pydrodelta.a5 import Observacion, Serie, Crud, observacionesListToDataFrame, observacionesDataFrameToList, createEmptyObsDataFrame, validate
+from fastjsonschema import JsonSchemaValueException
 import unittest
 from pydrodelta.util import tryParseAndLocalizeDate
 from pandas import DataFrame, DatetimeIndex
@@ -66,6 +67,24 @@ class Test_a5Serie(unittest.TestCase):
         self.assertEqual(serie_dict["observaciones"][0]["valor"],123.456)
         self.assertEqual(serie_dict["observaciones"][0]["tipo"],"puntual")
 
+class Test_a5Validate(unittest.TestCase):
+
+    def test_validate_observacion(self):
+        validate({"timestart": "2020-01-01T00:00:00-03:00", "valor": 1.5}, "Observacion")
+        with self.assertRaises(JsonSchemaValueException):
+            validate({"timestart": "2020-01-01T00:00:00-03:00", "valor": None}, "Observacion")
+        with self.assertRaises(JsonSchemaValueException):
+            validate({"valor": 1.5}, "Observacion")
+
+    def test_validate_corrida(self):
+        validate({"forecast_date": "2020-01-01T00:00:00-03:00", "series": [{"series_table": "series", "series_id": 1, "pronosticos": []}]}, "Corrida")
+        with self.assertRaises(JsonSchemaValueException):
+            validate({"forecast_date": "2020-01-01T00:00:00-03:00"}, "Corrida")
+
+    def test_validate_invalid_class(self):
+        with self.assertRaisesRegex(Exception, "Invalid class"):
+            validate({}, "NotAClass")
+
 class Test_a5Crud(unittest.TestCase):
     
     def test_constructor(self):
@@ -76,7 +95,27 @@ class Test_a5Crud(unittest.TestCase):
         self.assertEqual(crud.url, "https://alerta.ina.gob.ar/test")
         self.assertEqual(crud.token, "my_token")
         self.assertIsNone(crud.proxy_dict)
-    
+
+    def test_session_authorization(self):
+        crud = Crud(
+            url = "https://alerta.ina.gob.ar/test",
+            token = "my_token"
+        )
+        self.assertEqual(crud._session.headers["Authorization"], "Bearer my_token")
+        crud.token = "other_token"
+        self.assertEqual(crud._session.headers["Authorization"], "Bearer other_token")
+
+    def test_create_observaciones_invalid(self):
+        crud = Crud(
+            url = "https://alerta.ina.gob.ar/test",
+            token = "my_token"
+        )
+        # validation fails before any request is sent
+        with self.assertRaises(JsonSchemaValueException):
+            crud.createObservaciones([{"timestart": "2020-01-01T00:00:00-03:00", "valor": None}], series_id = 1)
+        with self.assertRaises(JsonSchemaValueException):
+            crud.createObservaciones([{"timestart": "2020-01-01T00:00:00-03:00", "valor": 1.5}, {"valor": 1.5}], series_id = 1)
+
     def test_read_series(self):
         crud = Crud(
             url = "https://alerta.ina.gob.ar/test",
@@ -112,7 +151,26 @@ class Test_a5Crud(unittest.TestCase):
             self.assert_(tryParseAndLocalizeDate(row["timestart"]) >= timestart)
             self.assert_(tryParseAndLocalizeDate(row["timestart"]) <= timeend)
             self.assertEqual(type(row["valor"]),float)
-    
+
+    def test_read_series_batch(self):
+        crud = Crud(
+            url = "https://alerta.ina.gob.ar/test",
+            token = "my_token"
+        )
+        series_ids = [8, 29]
+        timestart = tryParseAndLocalizeDate("2022-07-15T03:00:00.000Z")
+        timeend = tryParseAndLocalizeDate("2022-07-17T03:00:00.000Z")
+        data = crud.readSeriesBatch(
+            series_ids,
+            timestart = timestart,
+            timeend = timeend
+        )
+        self.assertEqual(list(data.keys()), series_ids)
+        for series_id in series_ids:
+            self.assert_("observaciones" in data[series_id])
+            for row in data[series_id]["observaciones"]:
+                self.assertEqual(row["series_id"],series_id)
+
     def test_read_calibrado(self):
         crud = Crud(
             url = "https://alerta.ina.gob.ar/test",
@@ -0,0 +1,189 @@
+from pydrodelta.calibration import Calibration, PENALTY_SCORE
+from pydrodelta.model_parameter import ModelParameter
+from pydrodelta.procedure_function import ProcedureFunction
+from pydrodelta.downhill_simplex import make_step_schedule, adaptive_coefficients
+import unittest
+import os
+import json
+import tempfile
+import numpy
+from numpy import asarray, empty
+
+class QuadraticFunction:
+    """Procedure function stub: two parameters bounded to [-10, 10]"""
+    _parameters = [
+        ModelParameter("a", (-10, -1, 1, 10)),
+        ModelParameter("b", (-10, -1, 1, 10))
+    ]
+    makeSimplex = ProcedureFunction.makeSimplex
+
+class QuadraticProcedure:
+    """Procedure stub whose score is the squared distance of the parameters to (1.5, -0.5)"""
+    target = asarray([1.5, -0.5])
+    output = None
+
+    def __init__(self):
+        self.function = QuadraticFunction()
+        self.runs = []
+
+    def loadInput(self):
+        pass
+
+    def loadOutputObs(self):
+        pass
+
+    def prepareStatisticsCache(self):
+        pass
+
+    def run(self, parameters, **kwargs):
+        self.runs.append(list(parameters))
+        self._parameters = asarray(parameters, dtype=float)
+
+    def computeScore(self, objective_function, result_index):
+        return float(((self._parameters - self.target)**2).sum())
+
+    def runBatch(self, parameters_batch, objective_function="rmse", result_index=0, dtype=None):
+        scores = empty(len(parameters_batch))
+        for i, parameters in enumerate(parameters_batch):
+            self.run(parameters)
+            scores[i] = self.computeScore(objective_function, result_index)
+        return scores
+
+class Test_Calibration(unittest.TestCase):
+
+    def test_make_simplex_out_of_bounds_vertex(self):
+        procedure = QuadraticProcedure()
+        procedure.function.makeSimplex = lambda **kwargs: [[0, 0], [20, 0], [1, 1]]
+        calibration = Calibration(procedure, limit=True)
+        calibration.makeSimplex()
+        self.assertEqual(calibration.simplex_scores[1], calibration._penalty_score)
+        self.assertEqual(calibration.simplex_scores[0], 2.5)
+        self.assertEqual(procedure.runs, [[0, 0], [1, 1]])
+        # initial vertices are memoized
+        calibration.runReturnScore([0, 0])
+        self.assertEqual(len(procedure.runs), 2)
+
+    def test_make_simplex_none_score(self):
+        procedure = QuadraticProcedure()
+        procedure.computeScore = lambda objective_function, result_index: None
+        calibration = Calibration(procedure)
+        with self.assertRaisesRegex(Exception, "returned None"):
+            calibration.makeSimplex()
+
+    def test_make_simplex_batch_run(self):
+        procedure = QuadraticProcedure()
+        procedure.batch_run = True
+        procedure.function.makeSimplex = lambda **kwargs: [[0, 0], [20, 0], [1, 1]]
+        calibration = Calibration(procedure, limit=True)
+        calibration.runReturnScore([1, 1])
+        calibration.makeSimplex()
+        self.assertEqual(list(calibration.simplex_scores), [2.5, calibration._penalty_score, 2.5])
+        self.assertEqual(procedure.runs, [[1, 1], [0, 0]])
+
+    def test_run_return_score_out_of_range(self):
+        procedure = QuadraticProcedure()
+        calibration = Calibration(procedure, limit=True, ranges=[(0, 1), (0, 1)])
+        self.assertEqual(calibration.runReturnScore([11, 0]), PENALTY_SCORE)
+        self.assertEqual(calibration.runReturnScore([0, -10.5]), PENALTY_SCORE)
+        self.assertEqual(procedure.runs, [])
+        # bounds are the parameter min-max constraints, not the initial ranges
+        self.assertEqual(calibration.runReturnScore([5, 0]), 12.5)
+        calibration.limit = False
+        self.assertEqual(calibration.runReturnScore([11, 0]), 90.5)
+        self.assertEqual(len(procedure.runs), 2)
+
+    def test_limit_override(self):
+        procedure = QuadraticProcedure()
+        procedure.function.makeSimplex = lambda **kwargs: [[0, 0], [20, 0], [1, 1]]
+        calibration = Calibration(procedure, limit=True)
+        self.assertEqual(calibration.runReturnScore([20, 0]), PENALTY_SCORE)
+        self.assertEqual(calibration.runReturnScore([20, 0], limit=False), 342.5)
+        calibration.makeSimplex(limit=False)
+        self.assertEqual(list(calibration.simplex_scores), [2.5, 342.5, 2.5])
+        procedure.batch_run = True
+        calibration = Calibration(procedure, limit=True)
+        calibration.makeSimplex(limit=False)
+        self.assertEqual(list(calibration.simplex_scores), [2.5, 342.5, 2.5])
+        # the limit resolved by downhillSimplex reaches the objective function
+        downhill_simplex = Calibration(QuadraticProcedure(), limit=True).downhillSimplex(inplace=False, limit=False)
+        self.assertEqual(downhill_simplex.f([20, 0]), 342.5)
+
+    def test_step_schedule(self):
+        schedule = make_step_schedule(kappa_0=4)
+        self.assertEqual(schedule(2., True, 0), 4.)
+        self.assertEqual(schedule(4., True, 0), 4.)
+        self.assertEqual(schedule(4., False, 1), 4.)
+        self.assertEqual(schedule(4., False, 3), 2.)
+        self.assertEqual(schedule(16., False, 15), 2.)
+        with self.assertRaises(ValueError):
+            make_step_schedule(kappa_0=0.5)
+
+    def test_step_schedule_from_config(self):
+        calibration = Calibration(QuadraticProcedure(), kappa_0=2, grow=3)
+        downhill_simplex = calibration.downhillSimplex(inplace=False)
+        self.assertEqual(downhill_simplex.kappa, 2.)
+        self.assertEqual(downhill_simplex.step_schedule.grow, 3.)
+        self.assertEqual(downhill_simplex.step_schedule.shrink, 0.5)
+        self.assertEqual(calibration.toDict()["kappa_0"], 2.)
+        self.assertIsNone(Calibration(QuadraticProcedure()).downhillSimplex(inplace=False).step_schedule)
+
+    def test_save_result(self):
+        numpy.random.seed(1)
+        calibration = Calibration(QuadraticProcedure(), dtype="float32")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            save_result = os.path.join(tmpdir, "result.json")
+            calibration.run(save_result=save_result)
+            with open(save_result) as f:
+                content = f.read()
+        self.assertTrue(content.startswith('{\n    "parameters": [\n        '))
+        result = json.loads(content)
+        self.assertEqual(result["parameters"], [float(x) for x in calibration.calibration_result[0]])
+
+    def test_final_run(self):
+        procedure = QuadraticProcedure()
+        calibration = Calibration(procedure)
+        calibration.run()
+        # the procedure output is the one of the calibrated parameters
+        self.assertEqual(procedure.runs[-1], calibration.calibration_result[0])
+
+    def test_workers(self):
+        results = []
+        for workers in (1, 2):
+            numpy.random.seed(7)
+            calibration = Calibration(QuadraticProcedure(), workers=workers)
+            calibration.run()
+            results.append(calibration.calibration_result)
+        self.assertEqual(results[0], results[1])
+        numpy.testing.assert_allclose(results[0][0], QuadraticProcedure.target, atol=1e-3)
+
+    def test_adaptive_coefficients(self):
+        n = 4
+        coefficients = adaptive_coefficients(n)
+        # Gao & Han: reflection 1, expansion 1+2/n (relative to the reflected point: 2/n), contraction 0.75-1/(2n), reduction 1-1/n
+        self.assertEqual(coefficients, {"refl": 1., "ext": 2. / n, "cont": 0.75 - 1. / (2 * n), "red": 1. - 1. / n})
+        procedure = QuadraticProcedure()
+        procedure.function._parameters = [ModelParameter(name, (-10, -1, 1, 10)) for name in "abcd"]
+        adaptive = Calibration(procedure, adaptive=True).downhillSimplex(inplace=False)
+        self.assertEqual((adaptive.refl, 1 + adaptive.ext, adaptive.cont, adaptive.red), (1., 1.5, 0.625, 0.75))
+        classic = Calibration(procedure).downhillSimplex(inplace=False)
+        self.assertEqual((classic.refl, 1 + classic.ext, classic.cont, classic.red), (1., 2., 0.5, 0.5))
+
+    def test_multistart_seed(self):
+        calibration = Calibration(QuadraticProcedure())
+        state = numpy.random.get_state()[1].copy()
+        first = calibration.runStart(3)
+        second = calibration.runStart(3)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, calibration.runStart(4))
+        # the start uses a local generator
+        numpy.testing.assert_array_equal(numpy.random.get_state()[1], state)
+
+    def test_multistart_workers(self):
+        results = []
+        for workers in (1, 2):
+            numpy.random.seed(11)
+            calibration = Calibration(QuadraticProcedure(), workers=workers, multistart=3)
+            calibration.run()
+            results.append(calibration.multistart_results)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(results[0]), 3)
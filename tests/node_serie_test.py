@@ -72,6 +72,21 @@ class Test_NodeSerie(unittest.TestCase):
         node_serie.loadData("2000-01-02T03:00:00.000Z","2000-01-05T03:00:00.000Z")   
         self.assertEqual(len(node_serie.data),1)
 
+    def test_series_load_keep_original(self):
+        node_serie = NodeSerie(
+            series_id = 1,
+            tipo = "puntual",
+            observations = [
+                ["2000-01-01T03:00:00.000Z", 1.01],
+            ]
+        )
+        node_serie.loadData("2000-01-01T03:00:00.000Z","2000-01-05T03:00:00.000Z")
+        self.assertIsNone(node_serie.original_data)
+        node_serie.loadData("2000-01-01T03:00:00.000Z","2000-01-05T03:00:00.000Z", keep_original = True)
+        self.assertTrue(node_serie.original_data.equals(node_serie.data))
+        node_serie.data.loc[:, "valor"] = 2.
+        self.assertEqual(node_serie.original_data["valor"].tolist(), [1.01])
+
     def test_series_load_csv_len(self):
         node_serie = NodeSerie(
             series_id = 1,
@@ -126,6 +141,43 @@ class Test_NodeSerie(unittest.TestCase):
             ]
         )
 
+    def test_to_list_after_inplace_write(self):
+        node_serie = NodeSerie(
+            series_id = 1,
+            tipo = "puntual",
+            observations = [
+                ["2000-01-01T03:00:00.000Z", 1.01],
+                ["2000-01-02T03:00:00.000Z", 2.02],
+            ]
+        )
+        node_serie.loadData("2000-01-01T03:00:00.000Z","2000-01-03T03:00:00.000Z")
+        self.assertEqual([x["valor"] for x in node_serie.toList()], [1.01, 2.02])
+        node_serie.data["valor"] = node_serie.data["valor"] * 2
+        self.assertEqual([x["valor"] for x in node_serie.toList()], [2.02, 4.04])
+    def test_to_list_extra_columns(self):
+        node_serie = NodeSerie(
+            series_id = 1,
+            tipo = "puntual",
+            observations = [
+                ["2000-01-01T03:00:00.000Z", 1.01],
+                ["2000-01-02T03:00:00.000Z", None],
+            ]
+        )
+        node_serie.loadData("2000-01-01T03:00:00.000Z","2000-01-03T03:00:00.000Z")
+        node_serie.data["error_band_01"] = [0.5, 1.5]
+        self.assertEqual(
+            node_serie.toList(include_series_id=True, remove_nulls=True),
+            [
+                {
+                    "valor": 1.01,
+                    "tag": "obs",
+                    "error_band_01": 0.5,
+                    "timestart": "2000-01-01T00:00:00-03:00",
+                    "timeend": "2000-01-01T00:00:00-03:00",
+                    "series_id": 1
+                }
+            ]
+        )
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
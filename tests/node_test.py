@@ -42,3 +42,22 @@ class Test_Node(TestCase):
             })   
         self.assertEqual(len(node.variables[2].series[0].data),3)
         self.assertEqual(len(node.variables[2].series_prono[0].data),91)
+
+    def test_datetime_index(self):
+        node = Node(
+            id = 1,
+            name = "node 1",
+            timestart = "2022-02-18T03:00:00.000Z",
+            timeend = "2022-02-19T03:00:00.000Z",
+            time_interval = { "hours": 1}
+        )
+        datetime_index = node.createDatetimeIndex()
+        self.assertEqual(len(datetime_index), 24)
+        self.assertEqual(datetime_index[0].isoformat(), "2022-02-18T00:00:00-03:00")
+        # callers get their own copy of the cached index
+        datetime_index.name = "renamed"
+        self.assertIsNone(node.datetime_index.name)
+        self.assertTrue(node.datetime_index.equals(datetime_index))
+        # the cached index is rebuilt when the time properties change
+        node.time_interval = { "hours": 6}
+        self.assertEqual(len(node.datetime_index), 4)
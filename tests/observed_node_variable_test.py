@@ -1,5 +1,8 @@
 from pydrodelta.observed_node_variable import ObservedNodeVariable
+from pydrodelta.node_serie import NodeSerie
+from pydrodelta.node_serie_prono import NodeSerieProno
 from unittest import TestCase
+from pandas import DataFrame, DatetimeIndex
 
 class Test_ObservedNodeVariable(TestCase):
 
@@ -66,3 +69,46 @@ class Test_ObservedNodeVariable(TestCase):
             })
 
 
+
+    def makePivotVariable(self, index):
+        # built without __init__, which reads the variable metadata from the input api
+        node_variable = ObservedNodeVariable.__new__(ObservedNodeVariable)
+        node_variable.series = [
+            NodeSerie(series_id = 1, tipo = "puntual", observations = []),
+            NodeSerie(series_id = 2, tipo = "puntual", observations = [])
+        ]
+        node_variable.series_prono = [NodeSerieProno(series_id = 3, cal_id = 1, cor_id = 1, tipo = "puntual")]
+        node_variable.series[0].data = DataFrame({"valor": [1., 2., 3.], "tag": ["a", "b", "c"]}, index = DatetimeIndex(index).tz_localize("America/Argentina/Buenos_Aires"))
+        node_variable.series[1].data = DataFrame({"valor": [4., 5.], "tag": ["d", "e"]}, index = DatetimeIndex(["2020-01-02", "2020-01-03"]).tz_localize("America/Argentina/Buenos_Aires"))
+        node_variable.series_prono[0].data = DataFrame({"valor": [6.], "tag": ["f"]}, index = DatetimeIndex(["2020-01-02"]).tz_localize("America/Argentina/Buenos_Aires"))
+        node_variable.series_output = node_variable.series
+        return node_variable
+
+    def test_pivot_data(self):
+        node_variable = self.makePivotVariable(["2020-01-01", "2020-01-02", "2020-01-03"])
+        data = node_variable.pivotData()
+        self.assertEqual(list(data.columns), ["valor_1", "valor_2", "valor_prono_3"])
+        self.assertEqual(data.fillna(-1).values.tolist(), [[1., -1., -1.], [2., 4., 6.], [3., 5., -1.]])
+        data = node_variable.pivotOutputData()
+        self.assertEqual(list(data.columns), ["valor_1", "tag_1", "valor_2", "tag_2"])
+        self.assertEqual(data["tag_2"].fillna("").tolist(), ["", "d", "e"])
+
+    def test_pivot_data_duplicate_timestamps(self):
+        node_variable = self.makePivotVariable(["2020-01-01", "2020-01-01", "2020-01-02"])
+        # same output as joining the series one at a time (duplicated timestamps are joined with each other)
+        data = node_variable.pivotData()
+        self.assertEqual(list(data.columns), ["valor_1", "valor_2", "valor_prono_3"])
+        self.assertEqual(data.fillna(-1).values.tolist(), [[1., -1., -1.], [2., -1., -1.], [1., -1., -1.], [2., -1., -1.], [3., 4., 6.], [-1., 5., -1.]])
+        data = node_variable.pivotOutputData()
+        self.assertEqual(list(data.columns), ["valor_1", "tag_1", "valor_2", "tag_2"])
+        self.assertEqual(data["tag_1"].fillna("").tolist(), ["a", "b", "a", "b", "c", ""])
+
+    def test_output_series_id(self):
+        node_variable = self.makePivotVariable(["2020-01-01", "2020-01-02", "2020-01-03"])
+        node_variable.data = node_variable.series[0].data
+        node_variable.time_support = None
+        node_variable.series_output = [NodeSerie(series_id = 10, tipo = "puntual", observations = [])]
+        self.assertEqual(node_variable.getData(include_series_id = True)["series_id"].tolist(), [10, 10, 10])
+        # series_id is read from series_output on use
+        node_variable.series_output[0].series_id = 11
+        self.assertEqual([o["series_id"] for o in node_variable.toList(include_series_id = True)], [11, 11, 11])
@@ -0,0 +1,215 @@
+from pydrodelta.util import createDatetimeSequence, serieRegular, interpolateData, serieFillNulls, isoformatDatetimeIndex, tryParseAndLocalizeDate, tryParseAndLocalizeDates, parseObservations, readDataFromCsvFile
+import unittest
+from pandas import DataFrame, DatetimeIndex, Series, Timestamp, date_range, isna
+from numpy import nan
+from datetime import timedelta
+import os
+
+def toList(serie):
+    return [None if isna(x) else x for x in serie]
+
+class Test_serieRegular(unittest.TestCase):
+
+    def makeData(self):
+        index = DatetimeIndex(["2020-01-01T00:00","2020-01-01T03:00","2020-01-01T07:30","2020-01-01T08:00"], name="timestart").tz_localize("America/Argentina/Buenos_Aires")
+        return DataFrame({"valor": [1., 4., nan, 8.], "tag": ["obs", None, None, "obs"]}, index = index)
+
+    def test_interpolation_limit(self):
+        data = serieRegular(self.makeData(), timedelta(hours=1), interpolation_limit=1, tag_column="tag")
+        self.assertEqual(len(data), 8)
+        self.assertEqual(data.index[0].isoformat(), "2020-01-01T00:00:00-03:00")
+        self.assertEqual(toList(data["valor"]), [1., 2., 3., 4., 4.8, None, None, None])
+        self.assertEqual(toList(data["tag"]), ["obs", "interpolated", "interpolated", None, "interpolated", None, None, None])
+
+    def test_interpolation_limit_boundary(self):
+        data = serieRegular(self.makeData(), timedelta(hours=1), interpolation_limit=2, tag_column="tag")
+        self.assertEqual(toList(data["valor"]), [1., 2., 3., 4., 4.8, 5.6, None, 7.2])
+        self.assertEqual(toList(data["tag"]), ["obs", "interpolated", "interpolated", None, "interpolated", "interpolated", None, "interpolated"])
+
+    def test_extrapolate(self):
+        data = serieRegular(self.makeData(), timedelta(hours=1), interpolation_limit=3, extrapolate=True, timeend=Timestamp("2020-01-01T10:00", tz="America/Argentina/Buenos_Aires"), tag_column="tag")
+        self.assertEqual(toList(data["valor"]), [1., 2., 3., 4., 4.8, 5.6, 6.4, 7.2, 8., 8.])
+        self.assertEqual(data["tag"].iloc[-2:].tolist(), ["obs", "extrapolated"])
+
+    def test_no_tag_column(self):
+        data = serieRegular(self.makeData()[["valor"]], timedelta(hours=1), interpolation_limit=1)
+        self.assertEqual(list(data.columns), ["valor"])
+        self.assertEqual(toList(data["valor"]), [1., 2., 3., 4., 4.8, None, None, None])
+
+    def test_no_interpolate(self):
+        data = serieRegular(self.makeData(), timedelta(hours=1), interpolate=False, tag_column="tag")
+        self.assertEqual(toList(data["valor"]), [1., None, None, 4., None, None, None, None])
+        self.assertEqual(toList(data["tag"]), ["obs", None, None, None, None, None, None, None])
+
+class Test_interpolateData(unittest.TestCase):
+
+    def makeData(self):
+        index = date_range("2020-01-01", periods=8, freq="h", tz="America/Argentina/Buenos_Aires", name="timestart")
+        return DataFrame({"valor": [nan, 1., nan, nan, nan, 5., nan, nan], "tag": [None, "obs", None, None, None, "obs", None, None]}, index = index)
+
+    def test_interpolation_limit(self):
+        data = interpolateData(self.makeData(), tag_column="tag", interpolation_limit=1)
+        self.assertEqual(toList(data["valor"]), [None, 1., 2., None, 4., 5., None, None])
+        self.assertEqual(toList(data["tag"]), [None, "obs", "interpolated", None, "interpolated", "obs", None, None])
+
+    def test_interpolation_limit_boundary(self):
+        data = interpolateData(self.makeData(), tag_column="tag", interpolation_limit=2)
+        self.assertEqual(toList(data["valor"]), [None, 1., 2., 3., 4., 5., None, None])
+        self.assertEqual(toList(data["tag"]), [None, "obs", "interpolated", "interpolated", "interpolated", "obs", None, None])
+
+    def test_extrapolate(self):
+        data = interpolateData(self.makeData(), tag_column="tag", interpolation_limit=2, extrapolate=True)
+        self.assertEqual(toList(data["valor"]), [1., 1., 2., 3., 4., 5., 5., 5.])
+        self.assertEqual(toList(data["tag"]), ["extrapolated", "obs", "interpolated", "interpolated", "interpolated", "obs", "extrapolated", "extrapolated"])
+
+    def test_no_tag_column(self):
+        data = interpolateData(self.makeData(), interpolation_limit=2, extrapolate=True)
+        self.assertEqual(toList(data["valor"]), [1., 1., 2., 3., 4., 5., 5., 5.])
+        self.assertEqual(toList(data["tag"]), [None, "obs", None, None, None, "obs", None, None])
+
+class Test_serieFillNulls(unittest.TestCase):
+
+    def makeData(self):
+        index = date_range("2020-01-01", periods=5, freq="h", tz="America/Argentina/Buenos_Aires", name="timestart")
+        data = DataFrame({"valor": [1., nan, nan, 4., nan], "tag": ["obs", None, None, "obs", None]}, index = index)
+        other_index = date_range("2020-01-01T01:00", periods=6, freq="h", tz="America/Argentina/Buenos_Aires", name="timestart")
+        other_data = DataFrame({"valor": [10., nan, 30., 40., 50., 60.], "tag": ["sim", None, "sim", "sim", "sim", "sim"]}, index = other_index)
+        return data, other_data
+
+    def test_fill(self):
+        data = serieFillNulls(*self.makeData(), bias=0.5, tag_column="tag")
+        self.assertEqual(len(data), 5)
+        self.assertEqual(toList(data["valor"]), [1., 10.5, None, 4., 40.5])
+        self.assertEqual(toList(data["tag"]), ["obs", "sim", None, "obs", "sim"])
+
+    def test_fill_value(self):
+        data = serieFillNulls(*self.makeData(), fill_value=-1., tag_column="tag")
+        self.assertEqual(toList(data["valor"]), [1., 10., -1., 4., 40.])
+        self.assertEqual(toList(data["tag"]), ["obs", "sim", "filled", "obs", "sim"])
+
+    def test_extend(self):
+        data = serieFillNulls(*self.makeData(), bias=0.5, extend=True, tag_column="tag")
+        self.assertEqual(len(data), 7)
+        self.assertEqual(toList(data["valor"]), [1., 10.5, None, 4., 40.5, 50.5, 60.5])
+        self.assertEqual(toList(data["tag"]), ["obs", "sim", None, "obs", "sim", "sim", "sim"])
+
+    def test_no_tag_column(self):
+        data, other_data = self.makeData()
+        data = serieFillNulls(data[["valor"]], other_data[["valor"]], bias=0.5)
+        self.assertEqual(list(data.columns), ["valor"])
+        self.assertEqual(toList(data["valor"]), [1., 10.5, None, 4., 40.5])
+
+    def test_shift_by(self):
+        data = serieFillNulls(*self.makeData(), bias=0.5, shift_by=1, tag_column="tag")
+        self.assertEqual(toList(data["valor"]), [1., None, 10.5, 4., 30.5])
+        self.assertEqual(toList(data["tag"]), ["obs", None, "sim", "obs", "sim"])
+
+    def test_shift_by_extend(self):
+        data = serieFillNulls(*self.makeData(), bias=0.5, shift_by=1, extend=True, tag_column="tag")
+        self.assertEqual(toList(data["valor"]), [1., None, 10.5, 4., 30.5, 40.5, 50.5])
+        self.assertEqual(toList(data["tag"]), ["obs", None, "sim", "obs", "sim", "sim", "sim"])
+
+class Test_isoformatDatetimeIndex(unittest.TestCase):
+
+    def test_tz_aware(self):
+        datetime_index = date_range("2020-01-01", periods=3, freq="D", tz="America/Argentina/Buenos_Aires")
+        self.assertEqual(list(isoformatDatetimeIndex(datetime_index)), ["2020-01-01T00:00:00-03:00", "2020-01-02T00:00:00-03:00", "2020-01-03T00:00:00-03:00"])
+
+    def test_naive(self):
+        datetime_index = DatetimeIndex(["2020-01-01T00:00:00", "2020-01-01T00:00:01"])
+        self.assertEqual(list(isoformatDatetimeIndex(datetime_index)), ["2020-01-01T00:00:00", "2020-01-01T00:00:01"])
+
+    def test_dst_transition(self):
+        # Buenos Aires DST ended on 2008-03-16 00:00 (-02:00 -> -03:00)
+        datetime_index = date_range("2008-03-15T22:00", periods=4, freq="h", tz="America/Argentina/Buenos_Aires")
+        self.assertEqual(list(isoformatDatetimeIndex(datetime_index)), ["2008-03-15T22:00:00-02:00", "2008-03-15T23:00:00-02:00", "2008-03-15T23:00:00-03:00", "2008-03-16T00:00:00-03:00"])
+        datetime_index = date_range("2021-10-31T01:00", periods=3, freq="h", tz="Europe/Madrid")
+        self.assertEqual(list(isoformatDatetimeIndex(datetime_index)), [x.isoformat() for x in datetime_index])
+
+    def test_fractional_seconds(self):
+        datetime_index = DatetimeIndex(["2020-01-01T00:00:00.5", "2020-01-01T00:00:01"]).tz_localize("America/Argentina/Buenos_Aires")
+        self.assertEqual(list(isoformatDatetimeIndex(datetime_index)), ["2020-01-01T00:00:00.500000-03:00", "2020-01-01T00:00:01-03:00"])
+
+class Test_tryParseAndLocalizeDates(unittest.TestCase):
+
+    def assertSameDates(self, dates):
+        parsed = tryParseAndLocalizeDates(Series(dates))
+        self.assertEqual(str(parsed.tz), "America/Argentina/Buenos_Aires")
+        self.assertEqual(list(parsed), [tryParseAndLocalizeDate(x) for x in dates])
+        return parsed
+
+    def test_tz_aware(self):
+        parsed = self.assertSameDates(["2020-01-01T03:00:00.000Z", "2020-01-02T00:00:00-03:00"])
+        self.assertEqual([x.isoformat() for x in parsed], ["2020-01-01T00:00:00-03:00", "2020-01-02T00:00:00-03:00"])
+
+    def test_naive(self):
+        parsed = self.assertSameDates(["2020-01-01T00:00:00", "2020-01-01T12:30:00.250"])
+        self.assertEqual([x.isoformat() for x in parsed], ["2020-01-01T00:00:00-03:00", "2020-01-01T12:30:00.250000-03:00"])
+
+    def test_mixed(self):
+        self.assertSameDates(["2020-01-01T00:00:00Z", "2020-01-01T00:00:00"])
+
+    def test_dst_transition(self):
+        # 2007-12-30T00:30 doesn't exist in Buenos Aires (DST gap), 2008-03-15T23:30 is ambiguous
+        parsed = self.assertSameDates(["2007-12-30T00:30:00", "2008-03-15T23:30:00"])
+        self.assertEqual([x.isoformat() for x in parsed], ["2007-12-30T01:30:00-02:00", "2008-03-15T23:30:00-03:00"])
+
+class Test_parseObservations(unittest.TestCase):
+
+    def test_absolute_dates(self):
+        observations = parseObservations([
+            {"timestart": "2020-01-01T03:00:00.000Z", "valor": 1},
+            ["2020-01-01T01:00:00", "2.5"],
+            [],
+            ("2020-01-01T02:00:00.500",),
+            {"timestart": "2007-12-30T00:30:00", "valor": None}
+        ])
+        self.assertEqual([o["timestart"] for o in observations], [tryParseAndLocalizeDate(x) for x in ["2020-01-01T03:00:00.000Z", "2020-01-01T01:00:00", "2020-01-01T02:00:00.500", "2007-12-30T00:30:00"]])
+        self.assertEqual([o["timestart"].isoformat() for o in observations[:3]], ["2020-01-01T00:00:00-03:00", "2020-01-01T01:00:00-03:00", "2020-01-01T02:00:00.500000-03:00"])
+        self.assertEqual([o["valor"] for o in observations], [1., 2.5, None, None])
+
+    def test_relative_dates(self):
+        observations = parseObservations([[1.5, 1], [{"days": 1}, 2], ["2020-01-01T00:00:00", 3]])
+        self.assertEqual(len(observations), 3)
+        self.assertTrue(observations[0]["timestart"] > observations[1]["timestart"] > observations[2]["timestart"])
+        self.assertEqual(str(observations[0]["timestart"].tzinfo), "America/Argentina/Buenos_Aires")
+        self.assertEqual([o["valor"] for o in observations], [1., 2., 3.])
+
+    def test_missing_timestart(self):
+        with self.assertRaises(Exception):
+            parseObservations([{"valor": 1}])
+        self.assertEqual(parseObservations([]), [])
+
+class Test_createDatetimeSequence(unittest.TestCase):
+
+    def test_dst_transition_hourly(self):
+        # Buenos Aires DST ended on 2008-03-16 00:00 (-02:00 -> -03:00)
+        sequence = createDatetimeSequence(None, timedelta(hours=1), tryParseAndLocalizeDate("2008-03-15T20:00:00-02:00"), tryParseAndLocalizeDate("2008-03-16T03:00:00-03:00"))
+        self.assertEqual([x.isoformat() for x in sequence], ["2008-03-15T20:00:00-02:00", "2008-03-15T21:00:00-02:00", "2008-03-15T22:00:00-02:00", "2008-03-15T23:00:00-03:00", "2008-03-16T00:00:00-03:00", "2008-03-16T01:00:00-03:00", "2008-03-16T02:00:00-03:00"])
+
+    def test_dst_transition_daily(self):
+        # daily steps keep local midnight across the utc offset change
+        sequence = createDatetimeSequence(None, timedelta(days=1), tryParseAndLocalizeDate("2008-03-14"), tryParseAndLocalizeDate("2008-03-18"))
+        self.assertEqual([x.isoformat() for x in sequence], ["2008-03-14T00:00:00-02:00", "2008-03-15T00:00:00-02:00", "2008-03-16T00:00:00-03:00", "2008-03-17T00:00:00-03:00"])
+
+    def test_no_dst(self):
+        sequence = createDatetimeSequence(date_range("2020-01-01T00:30", periods=3, freq="6h", tz="America/Argentina/Buenos_Aires"), timedelta(hours=3))
+        self.assertEqual([x.isoformat() for x in sequence], ["2020-01-01T03:00:00-03:00", "2020-01-01T06:00:00-03:00", "2020-01-01T09:00:00-03:00", "2020-01-01T12:00:00-03:00"])
+
+class Test_readDataFromCsvFile(unittest.TestCase):
+
+    csv_file = os.path.join(os.environ["PYDRODELTA_DIR"], "data/csv/csv_file_sample.csv")
+
+    def test_read(self):
+        data = readDataFromCsvFile(self.csv_file, 2, tryParseAndLocalizeDate("2023-04-23T00:00:00-03:00"), tryParseAndLocalizeDate("2023-04-23T01:00:00-03:00"))
+        self.assertEqual([o["timestart"].isoformat() for o in data], ["2023-04-23T00:00:00-03:00", "2023-04-23T01:00:00-03:00"])
+        self.assertEqual([o["valor"] for o in data], [-1.1392541785920542, -0.906699165398662])
+        self.assertEqual([o["series_id"] for o in data], [2, 2])
+
+    def test_missing_column(self):
+        with self.assertRaisesRegex(Exception, "column 3 missing"):
+            readDataFromCsvFile(self.csv_file, 3)
+
+    def test_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            readDataFromCsvFile(os.path.join(os.environ["PYDRODELTA_DIR"], "data/csv/missing.csv"), 1)